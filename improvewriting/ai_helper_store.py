@@ -0,0 +1,153 @@
+# aiHelper/current 문서 저장 형식 (버전 있는 네이티브 맵 + 이전 JSON 문자열 호환)
+
+import json
+
+from google.cloud import firestore as gcf
+
+from async_runtime import with_timeout
+from batch_writes import commit_chunked, set_write
+from etags import CONTENT_HASH_FIELD, content_hash
+
+# 현재 저장 형식 버전
+# - 1 (버전 필드 없음): {'content': JSON 문자열, 'updatedAt'}
+# - 2: {'schemaVersion', 'keywords', 'exampleSentence', 'exampleSentences', 'contentHash', 'updatedAt'}
+SCHEMA_VERSION = 2
+SCHEMA_VERSION_FIELD = 'schemaVersion'
+# 키워드가 같을 때 병합 쓰기로 갱신하는 필드
+SENTENCE_FIELDS = ('exampleSentence', 'exampleSentences')
+# 쓰기 전에 읽는 필드 (문장 본문은 읽지 않음)
+PLAN_FIELDS = [CONTENT_HASH_FIELD, SCHEMA_VERSION_FIELD, 'keywords']
+# 마이그레이션 시 한 번에 읽는 문서 수
+MIGRATION_PAGE_SIZE = 500
+
+
+def ai_helper_document(ai_content):
+    """
+    AI 영감 내용을 aiHelper/current 문서(버전 2)로 만듭니다.
+    exampleSentences는 문장이 하나여도 항상 목록으로 저장합니다.
+    """
+    return {
+        SCHEMA_VERSION_FIELD: SCHEMA_VERSION,
+        'keywords': list(ai_content.get('keywords') or []),
+        'exampleSentence': ai_content.get('exampleSentence', ''),
+        'exampleSentences': list(ai_content.get('exampleSentences') or [ai_content.get('exampleSentence', '')]),
+        CONTENT_HASH_FIELD: content_hash(ai_content),
+        'updatedAt': gcf.SERVER_TIMESTAMP,
+    }
+
+
+def read_ai_helper(data):
+    """
+    저장된 문서(dict)에서 AI 영감 내용을 꺼냅니다. 버전 2와 이전 JSON 문자열 문서를 모두 읽습니다.
+    읽을 수 없으면 None입니다.
+    """
+    if not data:
+        return None
+    if data.get(SCHEMA_VERSION_FIELD, 1) >= 2:
+        ai_content = {
+            'keywords': data.get('keywords') or [],
+            'exampleSentence': data.get('exampleSentence', ''),
+        }
+        sentences = data.get('exampleSentences') or []
+        if len(sentences) > 1:
+            ai_content['exampleSentences'] = sentences
+        return ai_content
+    content = data.get('content')
+    if isinstance(content, str):
+        try:
+            parsed = json.loads(content)
+        except ValueError:
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    return None
+
+
+def _plan(snapshot, document):
+    # (방법, 데이터)를 정합니다. 같은 내용이면 None(쓰지 않음),
+    # 버전 2이고 키워드가 같으면 문장 필드만 병합, 아니면 문서 전체를 씁니다.
+    current = snapshot.to_dict() if snapshot.exists else None
+    if not current:
+        return 'set', document
+    if current.get(CONTENT_HASH_FIELD) == document[CONTENT_HASH_FIELD]:
+        return None
+    if current.get(SCHEMA_VERSION_FIELD) == SCHEMA_VERSION and current.get('keywords') == document['keywords']:
+        fields = {field: document[field] for field in SENTENCE_FIELDS}
+        fields[CONTENT_HASH_FIELD] = document[CONTENT_HASH_FIELD]
+        fields['updatedAt'] = document['updatedAt']
+        return 'merge', fields
+    return 'set', document
+
+
+def save_ai_helper(doc_ref, ai_content):
+    """
+    aiHelper/current에 AI 영감을 저장하고 사용한 방법('set', 'merge', 없으면 None)을 반환합니다.
+    저장된 내용과 같으면 쓰지 않으므로 실시간 리스너가 깨어나지 않습니다.
+    """
+    plan = _plan(doc_ref.get(field_paths=PLAN_FIELDS), ai_helper_document(ai_content))
+    if plan is None:
+        return None
+    method, data = plan
+    doc_ref.set(data, merge=(method == 'merge'))
+    return method
+
+
+async def save_ai_helper_async(doc_ref, ai_content, timeout):
+    """
+    save_ai_helper의 AsyncClient 버전입니다 (호출마다 제한 시간 적용).
+    """
+    snapshot = await with_timeout(doc_ref.get(field_paths=PLAN_FIELDS), timeout)
+    plan = _plan(snapshot, ai_helper_document(ai_content))
+    if plan is None:
+        return None
+    method, data = plan
+    await with_timeout(doc_ref.set(data, merge=(method == 'merge')), timeout)
+    return method
+
+
+def migrate_legacy_ai_helpers(db, limit=None, dry_run=False, page_size=MIGRATION_PAGE_SIZE):
+    """
+    모든 aiHelper 문서 중 JSON 문자열 형식(버전 1)을 버전 2로 바꿉니다.
+    - collection group 쿼리로 page_size개씩 읽고, 바꿀 문서를 500개 단위 배치로 씁니다.
+    - 기존 updatedAt은 그대로 유지합니다.
+    - 여러 번 실행해도 안전합니다 (이미 버전 2인 문서는 건너뜀).
+    처리 결과 개수를 dict로 반환합니다.
+    """
+    counts = {'scanned': 0, 'migrated': 0, 'alreadyCurrent': 0, 'unreadable': 0, 'failed': 0}
+    base_query = db.collection_group('aiHelper').limit(page_size)
+    last_snapshot = None
+    while limit is None or counts['scanned'] < limit:
+        query = base_query if last_snapshot is None else base_query.start_after(last_snapshot)
+        page = list(query.stream())
+        if limit is not None:
+            page = page[:limit - counts['scanned']]
+        if not page:
+            break
+
+        groups = []
+        for snapshot in page:
+            counts['scanned'] += 1
+            data = snapshot.to_dict() or {}
+            if data.get(SCHEMA_VERSION_FIELD, 1) >= SCHEMA_VERSION:
+                counts['alreadyCurrent'] += 1
+                continue
+            ai_content = read_ai_helper(data)
+            if ai_content is None:
+                counts['unreadable'] += 1
+                continue
+            document = ai_helper_document(ai_content)
+            if 'updatedAt' in data:
+                document['updatedAt'] = data['updatedAt']
+            groups.append((snapshot.reference.path, [set_write(snapshot.reference, document)]))
+
+        if groups and not dry_run:
+            results = commit_chunked(db, groups)
+            failed = sum(1 for error in results.values() if error is not None)
+            counts['failed'] += failed
+            counts['migrated'] += len(groups) - failed
+        elif groups:
+            counts['migrated'] += len(groups)
+
+        if len(page) < page_size:
+            break
+        last_snapshot = page[-1]
+    return counts
@@ -0,0 +1,85 @@
+# asyncio 기반 Firestore 런타임 (백그라운드 이벤트 루프 1개를 인스턴스 전역으로 공유)
+
+import asyncio
+import threading
+import time
+
+from runtime import FirebaseRuntime, get_runtime
+
+# 개별 Firestore 호출 제한 시간 (초)
+DEFAULT_CALL_TIMEOUT = 5.0
+
+
+class AsyncFirebaseRuntime(FirebaseRuntime):
+    """
+    AsyncClient와 그 클라이언트가 묶인 이벤트 루프를 보관합니다.
+    - gRPC aio 채널은 생성된 루프에서만 쓸 수 있으므로
+      요청마다 asyncio.run()을 하지 않고 전용 루프 스레드에 코루틴을 보냅니다.
+    """
+
+    def __init__(self, app, db, loop, init_seconds=0.0):
+        super().__init__(app, db, init_seconds)
+        self.loop = loop
+
+    def submit(self, coro):
+        """
+        코루틴을 루프에 보내고 concurrent.futures.Future를 반환합니다.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout):
+        """
+        코루틴을 실행하고 최대 timeout초 동안 결과를 기다립니다.
+        """
+        return self.submit(coro).result(timeout)
+
+
+async def with_timeout(awaitable, timeout=DEFAULT_CALL_TIMEOUT):
+    """
+    Firestore 호출 하나에 제한 시간을 적용합니다.
+    """
+    return await asyncio.wait_for(awaitable, timeout)
+
+
+_async_runtime = None
+_async_runtime_lock = threading.Lock()
+
+
+def _start_loop():
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def _run():
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    threading.Thread(target=_run, name='firestore-async-loop', daemon=True).start()
+    ready.wait()
+    return loop
+
+
+def get_async_runtime():
+    """
+    프로세스 전역 비동기 런타임을 반환합니다. 최초 호출 시에만 초기화합니다.
+    Firebase 앱은 동기 런타임과 공유합니다.
+    """
+    global _async_runtime
+    runtime = _async_runtime
+    if runtime is not None:
+        return runtime
+
+    with _async_runtime_lock:
+        if _async_runtime is None:
+            started = time.perf_counter()
+            app = get_runtime().app
+            loop = _start_loop()
+
+            async def _make_client():
+                # 비동기 클라이언트 모듈은 처음 쓸 때 가져옵니다 (콜드 스타트에서 제외).
+                from firebase_admin import firestore_async
+                return firestore_async.client(app)
+
+            db = asyncio.run_coroutine_threadsafe(_make_client(), loop).result()
+            _async_runtime = AsyncFirebaseRuntime(app, db, loop, time.perf_counter() - started)
+        return _async_runtime
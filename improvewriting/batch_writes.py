@@ -0,0 +1,92 @@
+# Firestore 다중 문서 쓰기 도우미 (WriteBatch 기반)
+
+# Firestore WriteBatch 한 번에 담을 수 있는 최대 쓰기 수
+MAX_BATCH_WRITES = 500
+
+
+def set_write(ref, data, merge=False):
+    return ('set', ref, data, merge)
+
+
+def update_write(ref, data):
+    return ('update', ref, data, False)
+
+
+def delete_write(ref):
+    return ('delete', ref, None, False)
+
+
+def _apply(batch, writes):
+    for op, ref, data, merge in writes:
+        if op == 'set':
+            if merge:
+                batch.set(ref, data, merge=True)
+            else:
+                batch.set(ref, data)
+        elif op == 'update':
+            batch.update(ref, data)
+        elif op == 'delete':
+            batch.delete(ref)
+        else:
+            raise ValueError(f"Unknown write operation: {op}")
+
+
+def commit_atomic(db, writes):
+    """
+    여러 문서 쓰기를 하나의 WriteBatch로 커밋합니다.
+    - 왕복 1회로 끝나고
+    - 모두 적용되거나 하나도 적용되지 않으므로
+      실시간 리스너가 절반만 바뀐 상태를 보지 않습니다.
+    """
+    writes = list(writes)
+    if not writes:
+        return None
+    if len(writes) > MAX_BATCH_WRITES:
+        raise ValueError(f"Too many writes for one batch: {len(writes)} > {MAX_BATCH_WRITES}")
+
+    batch = db.batch()
+    _apply(batch, writes)
+    return batch.commit()
+
+
+def chunk_write_groups(groups, max_writes=MAX_BATCH_WRITES):
+    """
+    (key, writes) 묶음들을 배치 크기 제한에 맞게 나눕니다.
+    한 묶음의 쓰기는 항상 같은 배치에 들어가므로 대상별 원자성이 유지됩니다.
+    """
+    chunks = []
+    current = []
+    current_size = 0
+    for key, writes in groups:
+        writes = list(writes)
+        if len(writes) > max_writes:
+            raise ValueError(f"Too many writes for one target {key}: {len(writes)} > {max_writes}")
+        if current and current_size + len(writes) > max_writes:
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append((key, writes))
+        current_size += len(writes)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def commit_chunked(db, groups, max_writes=MAX_BATCH_WRITES):
+    """
+    여러 대상의 쓰기를 최대 max_writes개씩 배치로 나누어 커밋합니다.
+    대상 key별로 오류 메시지(성공 시 None)를 담은 dict를 반환합니다.
+    """
+    results = {}
+    for chunk in chunk_write_groups(groups, max_writes):
+        batch = db.batch()
+        for _, writes in chunk:
+            _apply(batch, writes)
+        try:
+            batch.commit()
+            error = None
+        except Exception as e:
+            error = str(e)
+        for key, _ in chunk:
+            results[key] = error
+    return results
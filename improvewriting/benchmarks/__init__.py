@@ -0,0 +1,11 @@
+"""
+로컬 벤치마크 도구 (배포 대상 아님).
+
+improvewriting 디렉터리에서 실행합니다.
+
+    python -m benchmarks.run --iterations 200 --latency-ms 5 --output bench.json
+    python -m benchmarks.load --classes 5,10,20,40 --students 30 --output load.json
+    python -m benchmarks.import_budget --runs 5 --budget-ms 1500
+    python -m benchmarks.image_server --port 8089 --latency-ms 50
+    python -m benchmarks.model_server --port 8090 --latency-ms 300
+"""
@@ -0,0 +1,435 @@
+# 벤치마크용 인메모리 Firestore 대역 (지연 시간 주입 가능)
+
+import asyncio
+import copy
+import itertools
+import random
+import threading
+import time
+from collections import Counter
+
+from google.api_core import exceptions
+from google.cloud.firestore_v1 import transforms
+
+_auto_ids = itertools.count()
+_transaction_ids = itertools.count(1)
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+    'in': lambda a, b: a in b,
+    'array_contains': lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+def _resolve_sentinels(data, current=None):
+    # SERVER_TIMESTAMP는 쓰기 시점의 시간으로, ArrayUnion/ArrayRemove는 기존 목록에 적용한 결과로 바꿉니다.
+    # DELETE_FIELD는 그대로 두고 update에서 필드를 지웁니다.
+    resolved = {}
+    current = current or {}
+    for key, value in data.items():
+        if value is transforms.DELETE_FIELD:
+            resolved[key] = value
+            continue
+        if value is transforms.SERVER_TIMESTAMP:
+            value = time.time()
+        elif isinstance(value, transforms.ArrayUnion):
+            existing = list(current.get(key) or [])
+            value = existing + [item for item in value.values if item not in existing]
+        elif isinstance(value, transforms.ArrayRemove):
+            value = [item for item in current.get(key) or [] if item not in value.values]
+        elif isinstance(value, dict):
+            value = _resolve_sentinels(value)
+        resolved[key] = copy.deepcopy(value)
+    return resolved
+
+
+class FakeSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+
+class FakeDocumentReference:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def collection(self, name):
+        return FakeCollectionReference(self._db, f'{self.path}/{name}')
+
+    def get(self, field_paths=None, transaction=None):
+        self._db._rpc('get')
+        if transaction is not None:
+            transaction._record_read(self.path)
+        return FakeSnapshot(self, self._db._read(self.path))
+
+    def set(self, data, merge=False):
+        self._db._rpc('set')
+        self._db._write('set', self.path, data, merge)
+
+    def update(self, data):
+        self._db._rpc('update')
+        self._db._write('update', self.path, data)
+
+    def delete(self):
+        self._db._rpc('delete')
+        self._db._write('delete', self.path)
+
+
+class FakeQuery:
+    def __init__(self, db, path, fields=None, orders=(), limit=None, filters=(), after=None, group=False):
+        self._db = db
+        self._group = group
+        self._path = path
+        self._fields = fields
+        self._orders = orders
+        self._limit = limit
+        self._filters = filters
+        self._after = after
+
+    def _copy(self, **changes):
+        state = dict(fields=self._fields, orders=self._orders, limit=self._limit,
+                     filters=self._filters, after=self._after, group=self._group)
+        state.update(changes)
+        return FakeQuery(self._db, self._path, **state)
+
+    def select(self, field_paths):
+        return self._copy(fields=list(field_paths))
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def start_after(self, snapshot):
+        return self._copy(after=snapshot.reference.path)
+
+    def _matching(self):
+        if self._group:
+            candidates = self._db._documents_in_group(self._path)
+        else:
+            candidates = self._db._documents_under(self._path + '/')
+        docs = [
+            (path, data) for path, data in candidates
+            if all(_OPERATORS[op](data.get(field), value) for field, op, value in self._filters)
+        ]
+        for field, direction in reversed(self._orders):
+            docs = [item for item in docs if field in item[1]]
+            docs.sort(key=lambda item: item[1][field], reverse=(direction == 'DESCENDING'))
+        if self._after is not None:
+            paths = [path for path, _ in docs]
+            docs = docs[paths.index(self._after) + 1:] if self._after in paths else []
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return docs
+
+    def stream(self, transaction=None):
+        self._db._rpc('stream')
+        for path, data in self._matching():
+            if self._fields is not None:
+                data = {field: data[field] for field in self._fields if field in data}
+            self._db.stats['documentsRead'] += 1
+            yield FakeSnapshot(FakeDocumentReference(self._db, path), data)
+
+    def get(self, transaction=None):
+        return list(self.stream())
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, db, path):
+        super().__init__(db, path)
+        self.id = path.rsplit('/', 1)[-1]
+
+    def document(self, document_id=None):
+        if document_id is None:
+            document_id = f'auto{next(_auto_ids):08d}'
+        return FakeDocumentReference(self._db, f'{self._path}/{document_id}')
+
+    def add(self, data):
+        reference = self.document()
+        reference.set(data)
+        return time.time(), reference
+
+
+class FakeTransaction:
+    """
+    gcf.transactional과 함께 쓰는 낙관적 트랜잭션입니다.
+    읽은 문서의 버전을 기억했다가, 커밋 시점에 하나라도 바뀌었으면 Aborted를 내 재시도하게 합니다.
+    """
+
+    def __init__(self, db, max_attempts=5):
+        self._db = db
+        self._max_attempts = max_attempts
+        self._read_only = False
+        self._id = None
+        self._reads = {}
+        self._writes = []
+
+    def _clean_up(self):
+        self._id = None
+        self._reads = {}
+        self._writes = []
+
+    def _begin(self, retry_id=None):
+        self._db._rpc('begin_transaction')
+        self._id = next(_transaction_ids)
+
+    def _record_read(self, path):
+        with self._db._lock:
+            self._reads.setdefault(path, self._db._versions[path])
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(('set', reference.path, data, merge))
+
+    def update(self, reference, data):
+        self._writes.append(('update', reference.path, data, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference.path, None, False))
+
+    def _commit(self):
+        self._db._rpc('commit')
+        with self._db._lock:
+            for path, version in self._reads.items():
+                if self._db._versions[path] != version:
+                    self._db.stats['transaction_aborted'] += 1
+                    self._clean_up()
+                    raise exceptions.Aborted(f'Transaction contention on {path}')
+            self._db._apply_writes(self._writes)
+        self._clean_up()
+        return []
+
+    def _rollback(self):
+        self._clean_up()
+
+
+class FakeWriteBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(('set', reference.path, data, merge))
+
+    def update(self, reference, data):
+        self._writes.append(('update', reference.path, data, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference.path, None, False))
+
+    def __len__(self):
+        return len(self._writes)
+
+    def commit(self):
+        self._db._rpc('commit')
+        with self._db._lock:
+            self._db._apply_writes(self._writes)
+        return []
+
+
+class FakeFirestore:
+    """
+    collection/collection_group/document/set/update/get/get_all/stream/batch/transaction을 지원하는 인메모리 Firestore입니다.
+    - latency_ms(+jitter_ms)만큼 RPC마다 잠들어 네트워크 왕복을 흉내냅니다.
+    - stats에 RPC 종류별 호출 수와 읽은 문서 수를 기록합니다.
+    """
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self._random = random.Random(seed)
+        self._documents = {}
+        self._versions = Counter()
+        self._lock = threading.RLock()
+        self.stats = Counter()
+
+    def _delay(self):
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._random.uniform(0, self.jitter_ms)
+        return delay / 1000.0
+
+    def _rpc(self, kind):
+        self.stats[kind] += 1
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _read(self, path):
+        with self._lock:
+            data = self._documents.get(path)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _write(self, op, path, data=None, merge=False, locked=False):
+        if not locked:
+            with self._lock:
+                return self._write(op, path, data, merge, locked=True)
+        self._versions[path] += 1
+        if op == 'delete':
+            self._documents.pop(path, None)
+            return
+        existing = self._documents.get(path)
+        if op == 'update':
+            if existing is None:
+                raise exceptions.NotFound(f'No document to update: {path}')
+            data = _resolve_sentinels(data, {key: existing.get(key) for key in data})
+            for key, value in data.items():
+                # 'activityData.currentPhase' 같은 점 경로는 중첩 맵 필드를 갱신합니다.
+                target = self._documents[path]
+                *parents, leaf = key.split('.')
+                for parent in parents:
+                    target = target.setdefault(parent, {})
+                if value is transforms.DELETE_FIELD:
+                    target.pop(leaf, None)
+                else:
+                    target[leaf] = value
+        elif merge and existing is not None:
+            existing.update(_resolve_sentinels(data, existing))
+        else:
+            self._documents[path] = _resolve_sentinels(data)
+
+    def _apply_writes(self, writes):
+        # 배치/트랜잭션 커밋: 없는 문서 update가 하나라도 있으면 아무것도 쓰지 않습니다 (잠금 안에서 호출).
+        exists = {}
+        for op, path, _, _ in writes:
+            if op == 'update' and not exists.get(path, path in self._documents):
+                raise exceptions.NotFound(f'No document to update: {path}')
+            exists[path] = op != 'delete'
+        for op, path, data, merge in writes:
+            self._write(op, path, data, merge, locked=True)
+
+    def _documents_under(self, prefix):
+        with self._lock:
+            return [
+                (path, copy.deepcopy(data)) for path, data in self._documents.items()
+                if path.startswith(prefix) and '/' not in path[len(prefix):]
+            ]
+
+    def _documents_in_group(self, collection_id):
+        with self._lock:
+            return sorted(
+                (path, copy.deepcopy(data)) for path, data in self._documents.items()
+                if path.split('/')[-2] == collection_id
+            )
+
+    def collection(self, name):
+        return FakeCollectionReference(self, name)
+
+    def collection_group(self, collection_id):
+        return FakeQuery(self, collection_id, group=True)
+
+    def document(self, path):
+        return FakeDocumentReference(self, path)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts=5, read_only=False):
+        return FakeTransaction(self, max_attempts)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        # 실제 클라이언트처럼 RPC 1회로 여러 문서를 읽습니다.
+        self._rpc('get_all')
+        return [FakeSnapshot(reference, self._read(reference.path)) for reference in references]
+
+    def reset_stats(self):
+        self.stats.clear()
+
+
+class FakeAsyncFirestore:
+    """
+    FakeFirestore와 같은 저장소를 공유하는 AsyncClient 대역입니다.
+    RPC 지연은 asyncio.sleep으로 흉내내므로 동시 읽기가 실제로 겹칩니다.
+    """
+
+    def __init__(self, sync_db):
+        self._sync = sync_db
+
+    def collection(self, name):
+        return _AsyncCollection(self._sync, self._sync.collection(name))
+
+
+class _AsyncDocument:
+    def __init__(self, sync_db, reference):
+        self._sync = sync_db
+        self._ref = reference
+        self.id = reference.id
+        self.path = reference.path
+
+    def collection(self, name):
+        return _AsyncCollection(self._sync, self._ref.collection(name))
+
+    async def _sleep(self, kind):
+        self._sync.stats[kind] += 1
+        await asyncio.sleep(self._sync._delay())
+
+    async def get(self, field_paths=None):
+        await self._sleep('get')
+        return FakeSnapshot(self._ref, self._sync._read(self.path))
+
+    async def set(self, data, merge=False):
+        await self._sleep('set')
+        self._sync._write('set', self.path, data, merge)
+
+    async def update(self, data):
+        await self._sleep('update')
+        self._sync._write('update', self.path, data)
+
+
+class _AsyncQuery:
+    def __init__(self, sync_db, query):
+        self._sync = sync_db
+        self._query = query
+
+    def select(self, field_paths):
+        return _AsyncQuery(self._sync, self._query.select(field_paths))
+
+    def order_by(self, field_path, direction='ASCENDING'):
+        return _AsyncQuery(self._sync, self._query.order_by(field_path, direction=direction))
+
+    def limit(self, count):
+        return _AsyncQuery(self._sync, self._query.limit(count))
+
+    def where(self, *args, **kwargs):
+        return _AsyncQuery(self._sync, self._query.where(*args, **kwargs))
+
+    async def stream(self):
+        self._sync.stats['stream'] += 1
+        await asyncio.sleep(self._sync._delay())
+        for path, data in self._query._matching():
+            if self._query._fields is not None:
+                data = {field: data[field] for field in self._query._fields if field in data}
+            self._sync.stats['documentsRead'] += 1
+            yield FakeSnapshot(FakeDocumentReference(self._sync, path), data)
+
+
+class _AsyncCollection(_AsyncQuery):
+    def __init__(self, sync_db, collection):
+        super().__init__(sync_db, collection)
+        self._collection = collection
+
+    def document(self, document_id=None):
+        return _AsyncDocument(self._sync, self._collection.document(document_id))
@@ -0,0 +1,56 @@
+# 핸들러를 인메모리 Firestore 위에서 실행하기 위한 도우미
+
+import flask
+
+import async_runtime
+import rate_limit
+import runtime
+from benchmarks.fake_firestore import FakeAsyncFirestore, FakeFirestore
+
+_app = flask.Flask('benchmarks')
+
+
+def install_fake_runtime(latency_ms=0.0, jitter_ms=0.0, seed=None):
+    """
+    런타임 싱글턴을 인메모리 Firestore로 교체하고 그 DB를 반환합니다.
+    비동기 런타임도 같은 저장소를 쓰도록 함께 교체합니다.
+    앞선 실행이 남긴 요청 제한 버킷은 비웁니다.
+    """
+    db = FakeFirestore(latency_ms=latency_ms, jitter_ms=jitter_ms, seed=seed)
+    runtime._runtime = runtime.FirebaseRuntime(None, db)
+    loop = async_runtime._start_loop()
+    async_runtime._async_runtime = async_runtime.AsyncFirebaseRuntime(None, FakeAsyncFirestore(db), loop)
+    rate_limit.LOAD_SHEDDER.reset()
+    return db
+
+
+def invoke(handler, data=None, method='POST', headers=None):
+    """
+    Flask 테스트 요청으로 HTTPS 핸들러를 호출하고 응답을 반환합니다.
+    """
+    options = {'method': method, 'headers': headers or {}}
+    if data is not None:
+        options['json'] = {'data': data}
+    with _app.test_request_context('/', **options):
+        return handler(flask.request)
+
+
+def seed_words(db, collection, scope_id, count, prefix='낱말'):
+    """
+    {collection}/{scope_id}/words에 낱말 문서 count개를 만듭니다 (지연 없이).
+    """
+    for index in range(count):
+        db._write('set', f'{collection}/{scope_id}/words/w{index:06d}', {
+            'text': f'{prefix}{index % 50}',
+            'authorId': f'student{index % 30}',
+            'authorName': f'학생{index % 30}',
+            'createdAt': float(index),
+        })
+
+
+def seed_images(db, collection, scope_id, alt1='Beautiful mountain landscape with clear sky',
+                alt2='Peaceful forest with sunlight filtering through trees'):
+    db._write('set', f'{collection}/{scope_id}/sharedImages/current', {
+        'url1': 'https://example.com/1.jpg', 'alt1': alt1,
+        'url2': 'https://example.com/2.jpg', 'alt2': alt2,
+    })
@@ -0,0 +1,107 @@
+# 이미지 검색 API 로컬 대역 서버 (image_provider 점검용)
+#
+#     python -m benchmarks.image_server --port 8089 --latency-ms 50
+#     IMAGE_PROVIDER_URL=http://127.0.0.1:8089/search/photos ...
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SAMPLE_TAGS = ('mountain', 'forest', 'water', 'flower', 'children', 'light')
+
+
+def sample_results(query, count):
+    """
+    Unsplash 검색 응답과 같은 모양의 결과를 만듭니다.
+    """
+    return {
+        'total': count,
+        'results': [
+            {
+                'id': f'{query}-{index}',
+                'urls': {'regular': f'https://images.example.com/{query}/{index}.jpg?w=800'},
+                'alt_description': f'{query} photo {index}',
+                'tags': [{'title': query}, {'title': SAMPLE_TAGS[index % len(SAMPLE_TAGS)]}],
+            }
+            for index in range(count)
+        ],
+    }
+
+
+class StubImageServer(ThreadingHTTPServer):
+    """
+    요청 수를 세고, 지연/실패를 흉내 낼 수 있는 검색 API 대역입니다.
+    fail=True이면 모든 요청에 503을 돌려줍니다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0.0, fail=False):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency_ms = latency_ms
+        self.fail = fail
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/search/photos'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        if server.fail:
+            self._send(503, {'errors': ['unavailable']})
+            return
+        params = parse_qs(urlsplit(self.path).query)
+        query = params.get('query', ['nature'])[0]
+        count = int(params.get('per_page', ['10'])[0])
+        self._send(200, sample_results(query, count))
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in for the image search API')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--fail', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = StubImageServer(args.port, args.latency_ms, args.fail)
+    print(f'Serving stub image search on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
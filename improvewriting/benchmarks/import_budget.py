@@ -0,0 +1,116 @@
+# 콜드 스타트 import 시간 예산 검사
+#
+#   python -m benchmarks.import_budget --runs 5 --budget-ms 1500 --local-budget-ms 60
+#
+# 새 인터프리터에서 `python -X importtime -c "import main"`을 runs번 실행해 중앙값을 잽니다.
+# - 전체: main 모듈 import에 걸린 누적 시간
+# - 로컬: 이 저장소 모듈(main, runtime, ...)이 자체적으로 쓴 시간의 합 (의존성 제외)
+# 어느 한쪽이라도 예산을 넘으면 종료 코드 1로 끝나므로 배포 전 검사에 쓸 수 있습니다.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# 예산 기본값 (밀리초). 함수 인스턴스 CPU가 느리면 환경 변수로 조정합니다.
+DEFAULT_BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', '1500'))
+DEFAULT_LOCAL_BUDGET_MS = float(os.environ.get('IMPORT_LOCAL_BUDGET_MS', '60'))
+# 콜드 스타트에서 이 저장소 코드가 직접 가져오지 않아야 하는 모듈 (처음 쓸 때 가져옴)
+DEFERRED_MODULES = ('firebase_admin.firestore_async',)
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def local_modules():
+    return {name[:-3] for name in os.listdir(SOURCE_DIR) if name.endswith('.py')}
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime 출력에서 모듈별 (자체 시간, 누적 시간) 마이크로초를 읽습니다.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        timings[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return timings
+
+
+def measure_once(module):
+    env = dict(os.environ, TIMING_LOGS='0', PYTHONDONTWRITEBYTECODE='0')
+    probe = f'import sys; import {module}; print(",".join(sorted(sys.modules)))'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', probe],
+        cwd=SOURCE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr), set(result.stdout.strip().split(','))
+
+
+def run(args):
+    local = local_modules()
+    totals, local_totals, slowest = [], [], {}
+    loaded = set()
+    # 첫 실행은 .pyc 생성이 섞이므로 버립니다.
+    measure_once(args.module)
+    for _ in range(args.runs):
+        timings, loaded = measure_once(args.module)
+        totals.append(timings[args.module][1] / 1000.0)
+        local_totals.append(sum(timings[name][0] for name in local if name in timings) / 1000.0)
+        for name, (self_us, _) in timings.items():
+            slowest[name] = slowest.get(name, 0) + self_us / args.runs
+
+    total_ms = statistics.median(totals)
+    local_ms = statistics.median(local_totals)
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    return {
+        'module': args.module,
+        'runs': args.runs,
+        'totalMs': round(total_ms, 1),
+        'localMs': round(local_ms, 1),
+        'budgetMs': args.budget_ms,
+        'localBudgetMs': args.local_budget_ms,
+        'eagerlyImported': eager,
+        'slowestModules': [
+            {'module': name, 'selfMs': round(self_us / 1000.0, 2)}
+            for name, self_us in sorted(slowest.items(), key=lambda item: -item[1])[:args.top]
+        ],
+        'ok': total_ms <= args.budget_ms and local_ms <= args.local_budget_ms and not eager,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ImproveWriting cold-start import budget check')
+    parser.add_argument('--module', default='main')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='전체 import 시간 예산')
+    parser.add_argument('--local-budget-ms', type=float, default=DEFAULT_LOCAL_BUDGET_MS,
+                        help='이 저장소 모듈 자체 시간 합계 예산')
+    parser.add_argument('--top', type=int, default=15, help='보고할 느린 모듈 수')
+    parser.add_argument('--json', action='store_true', help='결과를 JSON으로 출력')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for item in report['slowestModules']:
+            print(f"{item['selfMs']:>9.2f} ms  {item['module']}")
+        print(f"import {report['module']}: {report['totalMs']} ms (budget {report['budgetMs']} ms), "
+              f"local modules: {report['localMs']} ms (budget {report['localBudgetMs']} ms)")
+        for name in report['eagerlyImported']:
+            print(f"{name} is imported at module load; import it on first use instead")
+        print('OK' if report['ok'] else 'OVER BUDGET')
+    return 0 if report['ok'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,319 @@
+# 수업 규모 부하 시험 (여러 반이 동시에 수업을 시작하는 상황 재현)
+#
+#   python -m benchmarks.load --classes 5,10,20,40 --students 30 --time-scale 0.02 --output load.json
+#
+# 반마다 아래 수업 대본을 시뮬레이션 시간에 맞춰 재생합니다.
+#   교사: startNewActivity(ForLesson) → (반 수업만) generateImages
+#   학생: 낱말 제출(+ 낱말 요약 트리거) → getAiInspiration(ForLesson) 여러 번
+# 짝수 번째 반은 classrooms 흐름, 홀수 번째 반은 lessons 흐름을 사용합니다.
+# 시뮬레이션 시간은 time-scale 배로 압축해 실제로 실행하고,
+# 도착률은 실제 수업 시간 기준으로, 처리 시간은 측정값으로 계산해 인스턴스 수를 추정합니다.
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import platform
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import install_fake_runtime, invoke
+from benchmarks.run import percentile
+from word_store import SUMMARY_SUBCOLLECTION, record_word
+
+# 낱말 요약 트리거를 보고서에서 부르는 이름
+TRIGGER_NAMES = {'classrooms': 'addClassWordSummary', 'lessons': 'addLessonWordSummary'}
+
+
+def session_script(step, class_index, args, rng):
+    """
+    반 하나의 (시뮬레이션 초, 동작, 컬렉션, 범위 ID, 인자) 목록을 만듭니다.
+    범위 ID에 단계를 넣어 단계마다 속도 제한 버킷이 새로 시작되게 합니다.
+    """
+    collection = 'classrooms' if class_index % 2 == 0 else 'lessons'
+    scope_id = f'load{step}-{collection}-{class_index}'
+    start = rng.uniform(0, args.start_spread)
+    events = [(start, 'start', collection, scope_id, None)]
+    for student in range(args.students):
+        for _ in range(args.words_per_student):
+            events.append((start + rng.uniform(10, 120), 'word', collection, scope_id,
+                           (student, f'낱말{rng.randrange(200)}')))
+        for _ in range(args.inspiration_presses):
+            events.append((start + rng.uniform(30, 180), 'inspiration', collection, scope_id, student))
+    if collection == 'classrooms':
+        events.append((start + rng.uniform(60, 120), 'images', collection, scope_id, None))
+    return events
+
+
+class LoadRun:
+    """
+    한 단계(반 수)의 요청 결과를 모읍니다.
+    """
+
+    def __init__(self, db, main):
+        self.db = db
+        self.main = main
+        self.runtime = main.get_runtime()
+        self.samples = defaultdict(list)
+        self.service = defaultdict(list)
+        self.arrivals = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.failures = defaultdict(Counter)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, kind, collection, scope_id, payload):
+        main = self.main
+        if kind == 'start':
+            if collection == 'classrooms':
+                return 'startNewActivity', invoke(main.startNewActivity, {'classId': scope_id})
+            return 'startNewActivityForLesson', invoke(main.startNewActivityForLesson, {'lessonId': scope_id})
+        if kind == 'images':
+            return 'generateImages', invoke(main.generateImages, {'classId': scope_id})
+        if kind == 'inspiration':
+            if collection == 'classrooms':
+                return 'getAiInspiration', invoke(main.getAiInspiration, {'classId': scope_id})
+            return 'getAiInspirationForLesson', invoke(main.getAiInspirationForLesson, {'lessonId': scope_id})
+
+        # 학생 낱말 제출은 클라이언트가 Firestore에 직접 쓰고, 요약 트리거 함수가 뒤따라 실행됩니다.
+        student, text = payload
+        words_ref = self.db.collection(collection).document(scope_id).collection('words')
+        _, word_ref = words_ref.add({
+            'text': text,
+            'authorId': f'student{student}',
+            'authorName': f'학생{student}',
+            'createdAt': time.time(),
+            'classId' if collection == 'classrooms' else 'lessonId': scope_id,
+        })
+        # 트리거 래퍼는 오류를 출력만 하고 삼키므로, 요약 갱신을 직접 불러 실패가 599로 집계되게 합니다.
+        data = self.db._read(word_ref.path)
+        summary_ref = self.runtime.scope_doc(collection, scope_id, SUMMARY_SUBCOLLECTION)
+        record_word(self.runtime.db, summary_ref, word_ref.id, data.get('text', ''), data.get('createdAt'))
+        return TRIGGER_NAMES[collection], None
+
+    def call(self, sim_time, kind, collection, scope_id, payload, scheduled_at):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            name, response = self._call(kind, collection, scope_id, payload)
+            status = response.status_code if response is not None else 200
+        except Exception as e:
+            name, status = TRIGGER_NAMES[collection] if kind == 'word' else kind, 599
+            error = f'{type(e).__name__}: {e}'
+        else:
+            error = None
+        finished = time.perf_counter()
+        with self._lock:
+            self.in_flight -= 1
+            self.service[name].append(finished - started)
+            self.samples[name].append(finished - scheduled_at)
+            self.arrivals[name].append(sim_time)
+            self.statuses[name][status] += 1
+            if error is not None:
+                self.failures[name][error] += 1
+
+
+def peak_rate(arrival_times, window=1.0):
+    """
+    시뮬레이션 시간 기준으로 window초 안에 도착한 최대 요청 수를 초당 값으로 반환합니다.
+    """
+    times = sorted(arrival_times)
+    best = 0
+    left = 0
+    for right, value in enumerate(times):
+        while value - times[left] > window:
+            left += 1
+        best = max(best, right - left + 1)
+    return best / window
+
+
+async def replay(events, load_run, time_scale, workers):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='load')
+    origin = time.perf_counter()
+
+    async def fire(event):
+        sim_time = event[0]
+        delay = origin + sim_time * time_scale - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        scheduled_at = time.perf_counter()
+        await loop.run_in_executor(executor, load_run.call, *event, scheduled_at)
+
+    try:
+        await asyncio.gather(*(fire(event) for event in events))
+    finally:
+        executor.shutdown(wait=True)
+
+
+def run_step(classes, args, rng):
+    db = install_fake_runtime(args.latency_ms, args.jitter_ms, seed=args.seed)
+    import main
+    from inspiration_cache import INSPIRATION_CACHE
+    INSPIRATION_CACHE.clear()
+
+    events = []
+    for class_index in range(classes):
+        events.extend(session_script(classes, class_index, args, rng))
+    events.sort(key=lambda event: event[0])
+    for _, _, collection, scope_id, _ in events:
+        db._write('set', f'{collection}/{scope_id}', {'name': scope_id})
+
+    load_run = LoadRun(db, main)
+    started = time.perf_counter()
+    asyncio.run(replay(events, load_run, args.time_scale, args.workers))
+    elapsed = time.perf_counter() - started
+
+    endpoints = []
+    for name in sorted(load_run.samples):
+        ordered = sorted(load_run.samples[name])
+        service = sorted(load_run.service[name])
+        statuses = load_run.statuses[name]
+        total = sum(statuses.values())
+        errors = sum(count for status, count in statuses.items() if status >= 400)
+        endpoints.append({
+            'endpoint': name,
+            'requests': total,
+            'errorRate': round(errors / total, 4) if total else 0.0,
+            'statuses': {str(status): count for status, count in sorted(statuses.items())},
+            'p50Ms': round(percentile(ordered, 0.50) * 1000, 3),
+            'p95Ms': round(percentile(ordered, 0.95) * 1000, 3),
+            'p99Ms': round(percentile(ordered, 0.99) * 1000, 3),
+            'serviceP95Ms': round(percentile(service, 0.95) * 1000, 3),
+            'peakRequestsPerSecond': peak_rate(load_run.arrivals[name]),
+            'failures': dict(load_run.failures[name].most_common(5)),
+        })
+
+    total_requests = sum(item['requests'] for item in endpoints)
+    return {
+        'classes': classes,
+        'students': classes * args.students,
+        'requests': total_requests,
+        'wallSeconds': round(elapsed, 3),
+        'throughputPerSecond': round(total_requests / elapsed, 2) if elapsed else 0.0,
+        'peakInFlight': load_run.peak_in_flight,
+        'firestore': dict(db.stats),
+        'endpoints': endpoints,
+    }
+
+
+def capacity_report(steps, max_instances, instance_concurrency, target_utilization):
+    """
+    함수별 필요 인스턴스 수를 리틀의 법칙으로 추정합니다.
+      동시 실행 수 = 최대 도착률(실제 초당) × p95 처리 시간
+      필요 인스턴스 = ceil(동시 실행 수 / (인스턴스당 동시 처리 수 × 목표 사용률))
+    max_instances는 함수마다 따로 적용되므로 함수별로 비교합니다.
+    """
+    per_step = []
+    largest_fit = 0
+    for step in steps:
+        functions = []
+        for endpoint in step['endpoints']:
+            concurrent = endpoint['peakRequestsPerSecond'] * endpoint['serviceP95Ms'] / 1000.0
+            required = max(1, math.ceil(concurrent / (instance_concurrency * target_utilization)))
+            functions.append({
+                'function': endpoint['endpoint'],
+                'peakRequestsPerSecond': endpoint['peakRequestsPerSecond'],
+                'serviceP95Ms': endpoint['serviceP95Ms'],
+                'requiredInstances': required,
+                'fits': required <= max_instances and endpoint['errorRate'] < 0.01,
+            })
+        fits = all(function['fits'] for function in functions)
+        if fits:
+            largest_fit = max(largest_fit, step['classes'])
+        per_step.append({'classes': step['classes'], 'fits': fits, 'functions': functions})
+
+    largest_step = max((step['classes'] for step in steps), default=0)
+    if largest_fit == largest_step:
+        verdict = f'max_instances={max_instances} is enough for {largest_step} concurrent classes'
+    elif largest_fit:
+        verdict = (f'max_instances={max_instances} is enough for up to {largest_fit} concurrent classes; '
+                   f'raise it (or instance concurrency) for {largest_step}')
+    else:
+        verdict = f'max_instances={max_instances} is not enough for the smallest tested class count'
+    return {
+        'maxInstances': max_instances,
+        'instanceConcurrency': instance_concurrency,
+        'targetUtilization': target_utilization,
+        'largestClassCountThatFits': largest_fit,
+        'verdict': verdict,
+        'steps': per_step,
+    }
+
+
+def run(args):
+    import main
+    rng = random.Random(args.seed)
+    class_counts = [int(value) for value in args.classes.split(',') if value.strip()]
+    steps = [run_step(classes, args, rng) for classes in class_counts]
+    max_instances = args.max_instances or main.MAX_INSTANCES
+    return {
+        'generatedAt': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'config': {
+            'classes': class_counts,
+            'studentsPerClass': args.students,
+            'wordsPerStudent': args.words_per_student,
+            'inspirationPresses': args.inspiration_presses,
+            'startSpreadSeconds': args.start_spread,
+            'timeScale': args.time_scale,
+            'latencyMs': args.latency_ms,
+            'jitterMs': args.jitter_ms,
+            'workers': args.workers,
+        },
+        'steps': steps,
+        'capacity': capacity_report(steps, max_instances, args.instance_concurrency, args.target_utilization),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ImproveWriting classroom-scale load test')
+    parser.add_argument('--classes', default='5,10,20,40', help='쉼표로 구분한 동시 수업 반 수 단계')
+    parser.add_argument('--students', type=int, default=30, help='반별 학생 수')
+    parser.add_argument('--words-per-student', type=int, default=3)
+    parser.add_argument('--inspiration-presses', type=int, default=2, help='학생별 AI 영감 요청 횟수')
+    parser.add_argument('--start-spread', type=float, default=60.0, help='반들의 수업 시작 시각 분포 (시뮬레이션 초)')
+    parser.add_argument('--time-scale', type=float, default=0.02, help='시뮬레이션 1초당 실제 실행 초')
+    parser.add_argument('--latency-ms', type=float, default=10.0, help='Firestore RPC당 주입할 지연 시간')
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--workers', type=int, default=64, help='동시에 실행할 최대 요청 수')
+    parser.add_argument('--max-instances', type=int, default=None, help='기본값: main.MAX_INSTANCES')
+    parser.add_argument('--instance-concurrency', type=int, default=1, help='인스턴스 하나가 동시에 처리하는 요청 수')
+    parser.add_argument('--target-utilization', type=float, default=0.7)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--verbose', action='store_true', help='핸들러 로그 출력을 그대로 표시')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (없으면 표준 출력)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        report = run(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        for step in report['steps']:
+            errors = sum(endpoint['errorRate'] * endpoint['requests'] for endpoint in step['endpoints'])
+            print(f"{step['classes']:>3} classes  {step['requests']:>6} requests  "
+                  f"{step['throughputPerSecond']:>8.1f}/s  errors {int(errors):>4}  "
+                  f"peak in-flight {step['peakInFlight']:>3}")
+        print(report['capacity']['verdict'])
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
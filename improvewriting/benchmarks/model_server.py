@@ -0,0 +1,96 @@
+# AI 영감 모델 서버 로컬 대역 (inspiration_backend 점검용)
+#
+#     python -m benchmarks.model_server --port 8090 --latency-ms 300
+#     INSPIRATION_MODEL_URL=http://127.0.0.1:8090/generate ...
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def sample_output(item):
+    """
+    입력 낱말로 흉내 낸 모델 출력을 만듭니다.
+    """
+    words = item.get('words') or ['이야기']
+    count = max(1, int(item.get('count') or 1))
+    return {
+        'keywords': [f'{word}처럼 빛나는' for word in words] + ['모델이 고른'],
+        'sentences': [f'[model] {words[0]}에 대한 {index + 1}번째 문장입니다.' for index in range(count)],
+    }
+
+
+class StubModelServer(ThreadingHTTPServer):
+    """
+    배치 크기를 기록하고, 지연/실패를 흉내 낼 수 있는 모델 서버 대역입니다.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0.0, fail=False):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.latency_ms = latency_ms
+        self.fail = fail
+        self.batch_sizes = []
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/generate'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', '0')))
+        inputs = json.loads(body or b'{}').get('inputs', [])
+        server.batch_sizes.append(len(inputs))
+        if server.latency_ms:
+            time.sleep(server.latency_ms / 1000.0)
+        if server.fail:
+            self._send(503, {'error': 'unavailable'})
+            return
+        self._send(200, {'outputs': [sample_output(item) for item in inputs]})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Local stand-in for the inspiration model server')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--fail', action='store_true')
+    args = parser.parse_args(argv)
+
+    server = StubModelServer(args.port, args.latency_ms, args.fail)
+    print(f'Serving stub inspiration model on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
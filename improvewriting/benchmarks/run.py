@@ -0,0 +1,149 @@
+# 엔드포인트별 처리량/지연 시간 벤치마크
+#
+#   python -m benchmarks.run --iterations 200 --latency-ms 5 --words 2000 --output bench.json
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import time
+
+from benchmarks.harness import install_fake_runtime, invoke, seed_images, seed_words
+from rate_limit import LOAD_SHEDDER
+
+
+def percentile(sorted_values, fraction):
+    """
+    정렬된 값에서 nearest-rank 방식의 백분위수를 반환합니다.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(name, durations, errors, elapsed, db_stats=None):
+    ordered = sorted(durations)
+    count = len(ordered)
+    result = {
+        'endpoint': name,
+        'requests': count,
+        'errors': errors,
+        'throughputPerSecond': round(count / elapsed, 2) if elapsed else 0.0,
+        'meanMs': round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        'p50Ms': round(percentile(ordered, 0.50) * 1000, 3),
+        'p95Ms': round(percentile(ordered, 0.95) * 1000, 3),
+        'p99Ms': round(percentile(ordered, 0.99) * 1000, 3),
+        'maxMs': round(ordered[-1] * 1000, 3) if count else 0.0,
+    }
+    if db_stats is not None:
+        result['firestorePerRequest'] = {
+            kind: round(value / count, 3) for kind, value in sorted(db_stats.items())
+        } if count else {}
+    return result
+
+
+def measure(name, call, iterations, db=None, before_each=None):
+    if db is not None:
+        db.reset_stats()
+    durations = []
+    errors = 0
+    started = time.perf_counter()
+    for index in range(iterations):
+        # 같은 범위로 반복 호출하므로 요청 제한 버킷을 비워 둡니다 (확인 비용은 그대로 측정).
+        LOAD_SHEDDER.reset()
+        if before_each is not None:
+            before_each(index)
+        t0 = time.perf_counter()
+        response = call(index)
+        durations.append(time.perf_counter() - t0)
+        if response is not None and getattr(response, 'status_code', 200) >= 400:
+            errors += 1
+    elapsed = time.perf_counter() - started
+    return summarize(name, durations, errors, elapsed, dict(db.stats) if db is not None else None)
+
+
+def run(args):
+    db = install_fake_runtime(args.latency_ms, args.jitter_ms, seed=args.seed)
+
+    # 핸들러 모듈은 가짜 런타임 설치 뒤에 가져옵니다.
+    import main
+    from inspiration_cache import INSPIRATION_CACHE
+
+    seed_words(db, 'classrooms', 'bench-class', args.words)
+    seed_words(db, 'lessons', 'bench-lesson', args.words)
+    seed_images(db, 'classrooms', 'bench-class')
+    seed_images(db, 'lessons', 'bench-lesson')
+
+    def clear_cache(_):
+        if args.cold_cache:
+            INSPIRATION_CACHE.clear()
+
+    n = args.iterations
+    results = [
+        measure('get_random_images', lambda i: main.get_random_images(), n),
+        measure('startNewActivity', lambda i: invoke(main.startNewActivity, {'classId': 'bench-class'}), n, db),
+        measure('generateImages', lambda i: invoke(main.generateImages, {'classId': 'bench-class'}), n, db),
+        measure('startNewActivityForLesson',
+                lambda i: invoke(main.startNewActivityForLesson, {'lessonId': 'bench-lesson'}), n, db),
+        measure('getAiInspiration',
+                lambda i: invoke(main.getAiInspiration, {'classId': 'bench-class'}), n, db, clear_cache),
+        measure('getAiInspirationForLesson',
+                lambda i: invoke(main.getAiInspirationForLesson, {'lessonId': 'bench-lesson'}), n, db, clear_cache),
+        measure('startActivitiesBulk',
+                lambda i: invoke(main.startActivitiesBulk, {'classIds': [f'bulk-{k}' for k in range(args.bulk_targets)]}),
+                max(n // 10, 1), db),
+    ]
+
+    return {
+        'generatedAt': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'config': {
+            'iterations': n,
+            'latencyMs': args.latency_ms,
+            'jitterMs': args.jitter_ms,
+            'words': args.words,
+            'coldCache': args.cold_cache,
+            'bulkTargets': args.bulk_targets,
+            'asyncInspiration': main.ASYNC_INSPIRATION,
+        },
+        'results': results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='ImproveWriting Cloud Functions local benchmark')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Firestore RPC당 주입할 지연 시간')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='RPC 지연에 더할 최대 무작위 지연')
+    parser.add_argument('--words', type=int, default=500, help='범위별로 미리 만들 낱말 문서 수')
+    parser.add_argument('--bulk-targets', type=int, default=20)
+    parser.add_argument('--cold-cache', action='store_true', help='AI 영감 캐시를 매 요청 전에 비움')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--verbose', action='store_true', help='핸들러 로그 출력을 그대로 표시')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (없으면 표준 출력)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 핸들러의 print() 로그가 결과 출력과 섞이지 않도록 기본적으로 숨깁니다.
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        report = run(args)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        for result in report['results']:
+            print(f"{result['endpoint']:<28} {result['throughputPerSecond']:>10.1f}/s  "
+                  f"p50 {result['p50Ms']:>8.3f}ms  p95 {result['p95Ms']:>8.3f}ms  p99 {result['p99Ms']:>8.3f}ms")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,37 @@
+# 저장 내용 해시 (ETag / If-None-Match)
+
+import hashlib
+import json
+
+# 저장 문서에 함께 기록하는 내용 해시 필드
+CONTENT_HASH_FIELD = 'contentHash'
+
+
+def content_hash(data):
+    """
+    dict/list 내용의 안정적인 해시를 반환합니다 (키 순서와 무관).
+    updatedAt 같은 서버 타임스탬프는 넣지 말아야 합니다.
+    """
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def etag_for(hash_value):
+    return f'"{hash_value}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    If-None-Match 헤더 값(여러 개, W/ 약한 비교, * 포함)이 etag와 맞는지 확인합니다.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
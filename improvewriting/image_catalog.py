@@ -0,0 +1,189 @@
+# 교육용 이미지 카탈로그 (모듈 로드 시 한 번만 구성)
+
+import csv
+import json
+import os
+import random
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+# 카탈로그 파일 경로 (JSON 또는 CSV). 없으면 코드에 내장된 목록을 사용합니다.
+CATALOG_PATH_ENV = 'IMAGE_CATALOG_PATH'
+
+
+class CatalogImage(NamedTuple):
+    url: str
+    alt: str
+    tags: tuple
+
+    def as_dict(self):
+        """
+        Firestore/응답에 쓰는 {'url', 'alt'} 형태로 변환합니다.
+        """
+        return {"url": self.url, "alt": self.alt}
+
+
+# 내장 이미지 목록 - 같은 사진(동일 기본 URL)은 한 번만 포함됩니다.
+DEFAULT_IMAGES = (
+    {
+        "url": "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=800&h=600&fit=crop",
+        "alt": "Beautiful mountain landscape with clear sky",
+        "tags": ("mountain", "landscape", "sky"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?w=800&h=600&fit=crop",
+        "alt": "Peaceful forest with sunlight filtering through trees",
+        "tags": ("forest", "tree", "light"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1472214103451-9374bd1c798e?w=800&h=600&fit=crop",
+        "alt": "Children playing in a sunny park",
+        "tags": ("children", "play", "park", "light"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1518837695005-2083093ee35b?w=800&h=600&fit=crop",
+        "alt": "Colorful flowers in a spring garden",
+        "tags": ("flower", "garden", "spring"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1469474968028-56623f02e42e?w=800&h=600&fit=crop",
+        "alt": "Serene lake with mountains in background",
+        "tags": ("water", "lake", "mountain"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1501594907352-04cda38ebc29?w=800&h=600&fit=crop",
+        "alt": "Misty morning in the mountains",
+        "tags": ("mountain", "morning"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1542273917363-3b1817f69a2d?w=800&h=600&fit=crop",
+        "alt": "City lights at night",
+        "tags": ("city", "night", "light"),
+    },
+    {
+        "url": "https://images.unsplash.com/photo-1598300042247-d088f8ab3a91?w=800&h=600&fit=crop",
+        "alt": "Butterfly on flower",
+        "tags": ("animal", "flower"),
+    },
+)
+
+
+def canonical_url(url):
+    """
+    쿼리스트링과 프래그먼트를 제거한 기본 URL을 반환합니다.
+    크기/크롭 옵션만 다른 같은 사진을 하나로 취급하기 위해 사용합니다.
+    """
+    parts = urlsplit(url.strip())
+    return f"{parts.scheme.lower()}://{parts.netloc.lower()}{parts.path}"
+
+
+def _normalize_tags(tags):
+    if isinstance(tags, str):
+        tags = tags.replace(';', ',').split(',')
+    return tuple(sorted({tag.strip().lower() for tag in tags or () if tag and tag.strip()}))
+
+
+class ImageCatalog:
+    """
+    중복 없는 불변 이미지 목록과 태그 인덱스를 보관합니다.
+    - 이미지 2장 선택은 카탈로그 크기와 무관하게 상수 시간에 끝납니다.
+    """
+
+    def __init__(self, entries):
+        images = []
+        seen = set()
+        for entry in entries:
+            url = (entry.get('url') or '').strip()
+            if not url:
+                continue
+            key = canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            images.append(CatalogImage(url, entry.get('alt', ''), _normalize_tags(entry.get('tags'))))
+
+        self.images = tuple(images)
+
+        tag_index = {}
+        for position, image in enumerate(self.images):
+            for tag in image.tags:
+                tag_index.setdefault(tag, []).append(position)
+        self.tag_index = {tag: tuple(positions) for tag, positions in tag_index.items()}
+
+    def __len__(self):
+        return len(self.images)
+
+    @property
+    def tags(self):
+        return tuple(sorted(self.tag_index))
+
+    def pick_pair(self, theme=None, rng=random):
+        """
+        서로 다른 이미지 2장을 반환합니다.
+        theme이 주어지면 해당 태그 이미지에서 우선 선택하고,
+        태그 이미지가 1장뿐이면 나머지 1장은 전체 카탈로그에서 고릅니다.
+        이미지가 2장 미만이면 None을 반환합니다.
+        """
+        total = len(self.images)
+        if total < 2:
+            return None
+
+        themed = self.tag_index.get(theme.strip().lower(), ()) if theme else ()
+        if len(themed) >= 2:
+            first, second = _distinct_positions(len(themed), rng)
+            return self.images[themed[first]], self.images[themed[second]]
+        if len(themed) == 1:
+            first = themed[0]
+            second = rng.randrange(total - 1)
+            if second >= first:
+                second += 1
+            return self.images[first], self.images[second]
+
+        first, second = _distinct_positions(total, rng)
+        return self.images[first], self.images[second]
+
+
+def _distinct_positions(size, rng):
+    # 재시도 없이 [0, size) 범위의 서로 다른 두 위치를 고릅니다.
+    first = rng.randrange(size)
+    second = rng.randrange(size - 1)
+    if second >= first:
+        second += 1
+    return first, second
+
+
+def load_catalog_entries(path):
+    """
+    JSON(리스트 또는 {"images": [...]}) 또는 CSV(url, alt, tags 컬럼) 파일에서
+    카탈로그 항목을 읽어옵니다. CSV의 tags는 쉼표/세미콜론으로 구분합니다.
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            return [dict(row) for row in csv.DictReader(f)]
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('images', [])
+    return list(data)
+
+
+def build_catalog(path=None):
+    """
+    파일 경로(또는 IMAGE_CATALOG_PATH 환경 변수)가 있으면 파일에서,
+    없거나 읽을 수 없으면 내장 목록으로 카탈로그를 만듭니다.
+    """
+    path = path or os.environ.get(CATALOG_PATH_ENV)
+    if path:
+        try:
+            catalog = ImageCatalog(load_catalog_entries(path))
+            if len(catalog) >= 2:
+                return catalog
+            print(f"Image catalog {path} has fewer than 2 images, using defaults")
+        except Exception as e:
+            print(f"Error loading image catalog {path}: {e}")
+    return ImageCatalog(DEFAULT_IMAGES)
+
+
+# 모듈 전역 카탈로그 - 인스턴스당 한 번만 구성됩니다.
+CATALOG = build_catalog()
@@ -0,0 +1,300 @@
+# 외부 이미지 검색 API 공급자 (연결 풀 + 회로 차단기 + 메모리/디스크 캐시)
+
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+from image_catalog import CATALOG, ImageCatalog
+from inspiration_cache import TTLCache
+from singleflight import SingleFlight
+
+# 검색 API 주소 (예: https://api.unsplash.com/search/photos). 없으면 내장 카탈로그만 사용합니다.
+PROVIDER_URL = os.environ.get('IMAGE_PROVIDER_URL', '')
+# Unsplash 호환 API 키 (Authorization: Client-ID ...)
+PROVIDER_KEY = os.environ.get('IMAGE_PROVIDER_KEY', '')
+# (연결, 읽기) 제한 시간 (초) - 활동 시작을 오래 붙잡지 않도록 짧게 둡니다.
+CONNECT_TIMEOUT = float(os.environ.get('IMAGE_PROVIDER_CONNECT_TIMEOUT', '0.5'))
+READ_TIMEOUT = float(os.environ.get('IMAGE_PROVIDER_READ_TIMEOUT', '1.5'))
+# 검색 결과 캐시 유지 시간 (초)
+CACHE_TTL_SECONDS = float(os.environ.get('IMAGE_PROVIDER_CACHE_TTL', '3600'))
+# 디스크 캐시 디렉터리 (빈 문자열이면 디스크 캐시 사용 안 함)
+CACHE_DIR = os.environ.get('IMAGE_PROVIDER_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'image-provider-cache'))
+# 디스크 캐시에 두는 최대 검색어(파일) 수 - Cloud Functions의 /tmp는 인스턴스 메모리이므로 넘으면 오래된 것부터 지웁니다.
+CACHE_MAX_FILES = int(os.environ.get('IMAGE_PROVIDER_CACHE_MAX_FILES', '128'))
+# 요청에서 받는 테마 목록 (쉼표 구분). 비우면 내장 카탈로그의 태그만 받습니다.
+# 아무 문자열이나 외부 검색어와 캐시 파일 이름이 되지 않도록 요청 검증과 공급자가 이 목록만 허용합니다.
+THEMES = tuple(sorted({
+    theme.strip().lower() for theme in os.environ.get('IMAGE_PROVIDER_THEMES', '').split(',') if theme.strip()
+})) or CATALOG.tags
+# 한 번에 받아올 검색 결과 수
+RESULTS_PER_QUERY = 30
+# 테마가 없을 때 사용할 검색어
+DEFAULT_QUERY = 'nature'
+# 연속 실패 횟수와 차단 유지 시간 (초)
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_RESET_SECONDS = 30.0
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 threshold회에 이르면 reset_seconds 동안 호출을 막습니다 (open).
+    시간이 지나면 한 번만 시험 호출을 허용하고 (half-open), 성공하면 다시 닫습니다.
+    시험 호출 결과가 reset_seconds 안에 기록되지 않으면 다음 시험 호출을 허용합니다.
+    """
+
+    def __init__(self, threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_started_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self._clock() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open':
+                now = self._clock()
+                if self._trial_started_at is None or now - self._trial_started_at >= self.reset_seconds:
+                    self._trial_started_at = now
+                    return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_started_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_started_at = None
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = self._clock()
+
+
+def _entry_from_result(result):
+    # 일반 형식 {'url', 'alt', 'tags'}와 Unsplash 검색 결과 형식을 모두 받습니다.
+    if not isinstance(result, dict):
+        return None
+    url = result.get('url') or (result.get('urls') or {}).get('regular')
+    if not url:
+        return None
+    alt = result.get('alt') or result.get('alt_description') or result.get('description') or ''
+    tags = result.get('tags') or ()
+    if tags and isinstance(tags, list) and isinstance(tags[0], dict):
+        tags = [tag.get('title', '') for tag in tags]
+    return {'url': url, 'alt': alt, 'tags': tags}
+
+
+def parse_search_response(data):
+    """
+    검색 API 응답(리스트 또는 {"results": [...]})을 카탈로그 항목 목록으로 바꿉니다.
+    """
+    results = data.get('results', []) if isinstance(data, dict) else data
+    return [entry for entry in map(_entry_from_result, results or ()) if entry]
+
+
+class RemoteImageProvider:
+    """
+    외부 검색 API에서 테마별 이미지 목록을 받아 ImageCatalog로 보관합니다.
+    - requests.Session 하나를 재사용해 keep-alive 연결 풀을 씁니다.
+    - 검색 결과는 메모리(TTL)와 디스크에 캐시되어 활동 시작마다 왕복하지 않습니다.
+    - 같은 검색어의 동시 조회는 한 번만 요청합니다.
+    - 실패가 이어지면 회로 차단기가 열려 곧바로 내장 카탈로그로 넘어갑니다.
+    - themes에 없는 테마는 검색하지 않고 (None 반환), 디스크 캐시는 cache_max_files개까지만 둡니다.
+    """
+
+    def __init__(self, base_url, api_key='', timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                 cache_ttl=CACHE_TTL_SECONDS, cache_dir=CACHE_DIR, breaker=None, session=None,
+                 themes=THEMES, cache_max_files=CACHE_MAX_FILES):
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache_dir = cache_dir
+        self.cache_max_files = cache_max_files
+        self.queries = frozenset(themes) | {DEFAULT_QUERY}
+        self.breaker = breaker or CircuitBreaker()
+        self._session = session
+        self._session_lock = threading.Lock()
+        self._memory = TTLCache(max_entries=64, ttl_seconds=cache_ttl)
+        self._flight = SingleFlight(idempotency_window=0)
+        self.fetches = 0
+        self.failures = 0
+        self.disk_hits = 0
+
+    @property
+    def session(self):
+        if self._session is None:
+            # requests는 원격 공급자를 처음 쓸 때 가져옵니다 (콜드 스타트에서 제외).
+            import requests
+            from requests.adapters import HTTPAdapter
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    if self.api_key:
+                        session.headers['Authorization'] = f'Client-ID {self.api_key}'
+                    session.headers['Accept'] = 'application/json'
+                    self._session = session
+        return self._session
+
+    def _disk_path(self, query):
+        digest = hashlib.sha1(f'{self.base_url}|{query}'.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.json')
+
+    def _read_disk(self, query, max_age):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(query), encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if max_age is not None and time.time() - cached.get('fetchedAt', 0) > max_age:
+            return None
+        return cached.get('images')
+
+    def _write_disk(self, query, entries):
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(query)
+            temp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetchedAt': time.time(), 'images': entries}, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            print(f"Could not write image cache: {e}")
+
+    def _evict_disk(self):
+        # 파일 수가 상한을 넘으면 가장 오래 전에 쓴 파일부터 지웁니다.
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+        if len(paths) <= self.cache_max_files:
+            return
+        aged = []
+        for path in paths:
+            try:
+                aged.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        for _, path in sorted(aged)[:len(aged) - self.cache_max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _fetch(self, query):
+        response = self.session.get(
+            self.base_url,
+            params={'query': query, 'per_page': RESULTS_PER_QUERY},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return parse_search_response(response.json())
+
+    def _load(self, query):
+        import requests
+        entries = self._read_disk(query, self.cache_ttl)
+        if entries:
+            self.disk_hits += 1
+            return ImageCatalog(entries)
+
+        if self.breaker.allow():
+            self.fetches += 1
+            try:
+                entries = self._fetch(query)
+                self.breaker.record_success()
+                if entries:
+                    self._write_disk(query, entries)
+                    return ImageCatalog(entries)
+            except (requests.RequestException, ValueError) as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                print(f"Image provider request failed: {e}")
+
+        # 새로 받지 못하면 만료된 디스크 캐시라도 사용합니다.
+        entries = self._read_disk(query, None)
+        return ImageCatalog(entries) if entries else None
+
+    def catalog_for(self, theme=None):
+        """
+        테마 검색 결과 카탈로그를 반환합니다. 받을 수 없으면 None입니다.
+        """
+        query = (theme or DEFAULT_QUERY).strip().lower()
+        if query not in self.queries:
+            return None
+        catalog = self._memory.get(query)
+        if catalog is not None:
+            return catalog
+        catalog, _ = self._flight.run(('imageSearch', query), lambda: self._load(query))
+        if catalog is not None and len(catalog) >= 2:
+            self._memory.put(query, catalog)
+            return catalog
+        return None
+
+    def stats(self):
+        return {
+            'fetches': self.fetches,
+            'failures': self.failures,
+            'diskHits': self.disk_hits,
+            'breaker': self.breaker.state,
+            'memoryCache': self._memory.stats(),
+        }
+
+
+class ImageProvider:
+    """
+    외부 공급자가 있으면 그 결과에서, 없거나 실패하면 내장 카탈로그에서 이미지 2장을 고릅니다.
+    """
+
+    def __init__(self, remote=None, fallback=CATALOG):
+        self.remote = remote
+        self.fallback = fallback
+
+    def pick_pair(self, theme=None, rng=random):
+        if self.remote is not None:
+            try:
+                catalog = self.remote.catalog_for(theme)
+                if catalog is not None:
+                    return catalog.pick_pair(theme, rng)
+            except Exception as e:
+                print(f"Image provider error, using built-in catalog: {e}")
+        return self.fallback.pick_pair(theme, rng)
+
+    def stats(self):
+        if self.remote is None:
+            return {'source': 'catalog'}
+        return {'source': 'remote', **self.remote.stats()}
+
+
+def build_provider(base_url=None):
+    base_url = base_url if base_url is not None else PROVIDER_URL
+    if not base_url:
+        return ImageProvider()
+    return ImageProvider(RemoteImageProvider(base_url, PROVIDER_KEY))
+
+
+# 모듈 전역 공급자 - 웜 인스턴스의 모든 요청이 세션과 캐시를 공유합니다.
+IMAGE_PROVIDER = build_provider()
@@ -0,0 +1,179 @@
+# AI 영감 모델 서버 연동 (마이크로 배칭 + 지연 예산 + 규칙 엔진 대체)
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from image_provider import CircuitBreaker
+
+# 모델 서버 주소. 없으면 규칙 엔진만 사용합니다.
+MODEL_URL = os.environ.get('INSPIRATION_MODEL_URL', '')
+# 모델 서버 인증 토큰 (Authorization: Bearer ...)
+MODEL_KEY = os.environ.get('INSPIRATION_MODEL_KEY', '')
+# 요청 하나가 모델 답을 기다리는 최대 시간. 넘기면 규칙 엔진이 답합니다 (밀리초).
+LATENCY_BUDGET_MS = float(os.environ.get('INSPIRATION_MODEL_BUDGET_MS', '800'))
+# 첫 요청 뒤 같은 배치로 묶을 요청을 기다리는 시간 (밀리초)
+BATCH_WINDOW_MS = float(os.environ.get('INSPIRATION_MODEL_BATCH_WINDOW_MS', '20'))
+# 모델 호출 한 번에 담는 최대 요청 수
+MAX_BATCH_SIZE = int(os.environ.get('INSPIRATION_MODEL_MAX_BATCH', '16'))
+# 모델 호출 HTTP 제한 시간 (초) - 예산을 넘긴 답은 버려지지만 연결은 정상 종료되도록 둡니다.
+HTTP_TIMEOUT = (0.5, float(os.environ.get('INSPIRATION_MODEL_TIMEOUT', '5')))
+# 동시에 진행할 수 있는 모델 호출 수
+MAX_CONCURRENT_BATCHES = 4
+
+
+def _valid_output(output):
+    if not isinstance(output, dict):
+        return None
+    keywords = output.get('keywords')
+    sentences = output.get('sentences')
+    if not (isinstance(keywords, list) and keywords and all(isinstance(k, str) for k in keywords)):
+        return None
+    if not (isinstance(sentences, list) and sentences and all(isinstance(s, str) for s in sentences)):
+        return None
+    return {'keywords': keywords, 'sentences': sentences}
+
+
+class ModelBackend:
+    """
+    모델 서버에 영감 생성을 요청합니다.
+    - 여러 레슨에서 동시에 들어온 요청을 BATCH_WINDOW_MS 동안 모아 한 번의 HTTP 호출로 보냅니다.
+      요청 형식: {"inputs": [{"scope", "words", "imageDescriptions", "count", "seed"}, ...]}
+      응답 형식: {"outputs": [{"keywords": [...], "sentences": [...]}, ...]} (입력과 같은 순서)
+    - 호출자는 최대 budget_ms만 기다리고, 그 안에 답이 없으면 None을 받아 규칙 엔진을 씁니다.
+    - 실패가 이어지면 회로 차단기가 열려 모델 호출 없이 곧바로 None을 돌려줍니다.
+    """
+
+    def __init__(self, url, api_key='', budget_ms=LATENCY_BUDGET_MS, batch_window_ms=BATCH_WINDOW_MS,
+                 max_batch_size=MAX_BATCH_SIZE, timeout=HTTP_TIMEOUT, breaker=None, session=None):
+        self.url = url
+        self.api_key = api_key
+        self.budget_ms = budget_ms
+        self.batch_window_ms = batch_window_ms
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.breaker = breaker or CircuitBreaker()
+        self._session = session
+        self._queue = queue.Queue()
+        self._start_lock = threading.Lock()
+        self._executor = None
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.batched_items = 0
+        self.answered = 0
+        self.over_budget = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        if self._executor is not None:
+            return
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            if self._session is None:
+                # requests는 모델 서버를 처음 부를 때 가져옵니다 (콜드 스타트에서 제외).
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_BATCHES, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                if self.api_key:
+                    session.headers['Authorization'] = f'Bearer {self.api_key}'
+                self._session = session
+            threading.Thread(target=self._collect_batches, name='inspiration-batcher', daemon=True).start()
+            self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES, thread_name_prefix='inspiration-model')
+
+    def _collect_batches(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_window_ms / 1000.0
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            # 이미 예산을 넘겨 포기한 요청은 보내지 않습니다.
+            live = [(payload, future) for payload, future in batch if future.set_running_or_notify_cancel()]
+            if live:
+                self._executor.submit(self._call_model, live)
+
+    def _call_model(self, batch):
+        import requests
+        with self._stats_lock:
+            self.batches += 1
+            self.batched_items += len(batch)
+        try:
+            response = self._session.post(
+                self.url, json={'inputs': [payload for payload, _ in batch]}, timeout=self.timeout
+            )
+            response.raise_for_status()
+            outputs = response.json().get('outputs')
+            if not isinstance(outputs, list) or len(outputs) != len(batch):
+                raise ValueError('Model response does not match the batch')
+        except (requests.RequestException, ValueError, AttributeError) as e:
+            self.breaker.record_failure()
+            with self._stats_lock:
+                self.errors += 1
+            print(f"Inspiration model request failed: {e}")
+            for _, future in batch:
+                future.set_result(None)
+            return
+        self.breaker.record_success()
+        for (_, future), output in zip(batch, outputs):
+            future.set_result(_valid_output(output))
+
+    def generate(self, scope, words, image_descriptions=None, count=1, seed=None):
+        """
+        {'keywords', 'sentences'}를 반환합니다. 예산 초과/오류/차단 시 None입니다.
+        """
+        if not self.breaker.allow():
+            return None
+        self._ensure_started()
+        future = Future()
+        self._queue.put(({
+            'scope': scope,
+            'words': list(words or []),
+            'imageDescriptions': list(image_descriptions or []),
+            'count': count,
+            'seed': seed,
+        }, future))
+        try:
+            result = future.result(self.budget_ms / 1000.0)
+        except (FutureTimeoutError, CancelledError):
+            future.cancel()
+            with self._stats_lock:
+                self.over_budget += 1
+            return None
+        if result is not None:
+            with self._stats_lock:
+                self.answered += 1
+        return result
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'meanBatchSize': round(self.batched_items / self.batches, 2) if self.batches else 0.0,
+                'answered': self.answered,
+                'overBudget': self.over_budget,
+                'errors': self.errors,
+                'breaker': self.breaker.state,
+            }
+
+
+def build_backend(url=None):
+    url = url if url is not None else MODEL_URL
+    if not url:
+        return None
+    return ModelBackend(url, MODEL_KEY)
+
+
+# 모듈 전역 모델 연동 - 없으면(None) 규칙 엔진만 사용합니다.
+INSPIRATION_MODEL = build_backend()
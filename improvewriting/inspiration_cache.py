@@ -0,0 +1,106 @@
+# AI 영감 결과 캐시 (인스턴스 메모리, LRU + TTL)
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = int(os.environ.get('INSPIRATION_CACHE_SIZE', '512'))
+DEFAULT_TTL_SECONDS = float(os.environ.get('INSPIRATION_CACHE_TTL', '300'))
+
+
+def content_fingerprint(scope, words, image_descriptions=None):
+    """
+    (범위, 정렬된 낱말, 이미지 설명)의 안정적인 해시를 반환합니다.
+    scope는 'lessons/{id}' 또는 'classrooms/{id}' 형태입니다.
+    """
+    payload = json.dumps(
+        [scope, sorted(word for word in words if word), list(image_descriptions or [])],
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def seed_for(fingerprint):
+    """
+    지문에서 난수 시드를 만듭니다. 같은 내용이면 같은 문장이 재현됩니다.
+    """
+    return int(fingerprint[:16], 16)
+
+
+class TTLCache:
+    """
+    스레드 안전 LRU + TTL 캐시입니다 (AI 영감 결과, 멱등성 응답 등에 사용).
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """
+        유효한 캐시 값을 반환합니다. 없거나 만료되었으면 None입니다.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        expires_at = self._clock() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def peek(self, key):
+        """
+        get과 같지만 히트/미스 카운터와 LRU 순서를 바꾸지 않습니다.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None and entry[0] > self._clock() else None
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        히트/미스 카운터와 현재 크기를 반환합니다.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# 모듈 전역 캐시 - 웜 인스턴스의 모든 요청이 공유합니다.
+INSPIRATION_CACHE = TTLCache()
@@ -0,0 +1,47 @@
+# JSON 인코더/디코더 선택 (orjson이 있으면 사용, 없으면 표준 json)
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson은 선택 의존성
+    orjson = None
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+if orjson is not None:
+    def dumps(obj):
+        """
+        obj를 UTF-8 JSON 바이트로 인코딩합니다.
+        """
+        return orjson.dumps(obj)
+
+    def loads(data):
+        """
+        JSON 바이트/문자열을 디코딩합니다.
+        """
+        return orjson.loads(data)
+
+    JSONDecodeError = orjson.JSONDecodeError
+else:
+    def dumps(obj):
+        """
+        obj를 UTF-8 JSON 바이트로 인코딩합니다.
+        """
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(data):
+        """
+        JSON 바이트/문자열을 디코딩합니다.
+        """
+        return json.loads(data)
+
+    JSONDecodeError = json.JSONDecodeError
+
+
+def dumps_str(obj):
+    """
+    obj를 JSON 문자열로 인코딩합니다 (Firestore 문자열 필드 저장용).
+    """
+    return dumps(obj).decode('utf-8')
@@ -0,0 +1,176 @@
+# 이미지 설명 → 개념 매칭 규칙 (모듈 로드 시 한 번만 컴파일)
+
+import json
+import os
+from collections import deque
+from functools import lru_cache
+
+# 추가 규칙 파일 경로 (JSON 리스트). 없으면 내장 규칙만 사용합니다.
+RULES_PATH_ENV = 'KEYWORD_RULES_PATH'
+
+# 개념 규칙 표
+# - patterns: 설명 문장에서 찾을 부분 문자열 (한국어/영어, 소문자 기준)
+# - keywords: 개념이 발견되면 추천할 꾸며주는 말
+# - element: 예시 문장에 넣을 장면 요소 (없으면 문장 생성에는 쓰지 않음)
+# 표의 순서가 곧 우선순위입니다.
+DEFAULT_RULES = (
+    {
+        'concept': 'mountain',
+        'patterns': ('mountain', 'landscape', '산', '풍경'),
+        'keywords': ('높이', '웅장한', '고요한'),
+        'element': '산',
+    },
+    {
+        'concept': 'forest',
+        'patterns': ('forest', 'tree', '나무', '숲'),
+        'keywords': ('생명력', '초록색', '신선한'),
+        'element': '숲',
+    },
+    {
+        'concept': 'children',
+        'patterns': ('child', 'play', '아이', '놀이'),
+        'keywords': ('즐거운', '활기찬', '순수한'),
+        'element': '아이들',
+    },
+    {
+        'concept': 'flower',
+        'patterns': ('flower', 'garden', '꽃', '정원'),
+        'keywords': ('화려한', '예쁜', '향기로운'),
+        'element': '꽃밭',
+    },
+    {
+        'concept': 'water',
+        'patterns': ('lake', 'water', '물', '호수'),
+        'keywords': ('맑은', '서늘한', '평화로운'),
+        'element': '물가',
+    },
+    {
+        'concept': 'light',
+        'patterns': ('sun', 'light', '햇빛', '빛'),
+        'keywords': ('밝은', '따뜻한', '찬란한'),
+        'element': None,
+    },
+)
+
+
+class ConceptMatcher:
+    """
+    모든 규칙의 패턴을 하나의 Aho-Corasick 오토마톤으로 컴파일합니다.
+    설명 문장을 한 번만 훑어서 등장하는 모든 개념을 찾으므로
+    비용이 규칙 수가 아니라 문장 길이에 비례합니다.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [0]  # 상태별로 끝나는 개념 비트마스크
+
+        for position, rule in enumerate(self.rules):
+            for pattern in rule['patterns']:
+                self._add(pattern.lower(), 1 << position)
+        self._build_fail_links()
+
+    def _add(self, pattern, mask):
+        state = 0
+        for char in pattern:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+                self._goto[state][char] = nxt
+            state = nxt
+        self._out[state] |= mask
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def match_mask(self, text):
+        """
+        text에 등장하는 개념들의 비트마스크를 반환합니다.
+        """
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        found = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= out[state]
+        return found
+
+    def match(self, text):
+        """
+        text에 등장하는 규칙들을 표 순서대로 튜플로 반환합니다.
+        """
+        mask = self.match_mask(text)
+        matched = []
+        while mask:
+            lowest = mask & -mask
+            matched.append(self.rules[lowest.bit_length() - 1])
+            mask ^= lowest
+        return tuple(matched)
+
+
+def load_rules(path=None):
+    """
+    내장 규칙 뒤에 KEYWORD_RULES_PATH(JSON 리스트)의 규칙을 덧붙입니다.
+    """
+    rules = list(DEFAULT_RULES)
+    path = path or os.environ.get(RULES_PATH_ENV)
+    if path:
+        try:
+            with open(path, encoding='utf-8') as f:
+                for rule in json.load(f):
+                    rules.append({
+                        'concept': rule['concept'],
+                        'patterns': tuple(rule.get('patterns', ())),
+                        'keywords': tuple(rule.get('keywords', ())),
+                        'element': rule.get('element'),
+                    })
+        except Exception as e:
+            print(f"Error loading keyword rules {path}: {e}")
+    return rules
+
+
+# 모듈 전역 매처 - 인스턴스당 한 번만 컴파일됩니다.
+MATCHER = ConceptMatcher(load_rules())
+
+
+@lru_cache(maxsize=4096)
+def match_description(description):
+    """
+    이미지 설명 하나에 매칭되는 규칙들을 반환합니다 (설명 문자열 단위로 메모이즈).
+    """
+    return MATCHER.match(description)
+
+
+def image_keywords(description):
+    """
+    설명에서 발견된 모든 개념의 추천 키워드를 규칙 순서대로 반환합니다.
+    """
+    keywords = []
+    for rule in match_description(description):
+        keywords.extend(rule['keywords'])
+    return keywords
+
+
+def image_element(description):
+    """
+    설명에서 발견된 첫 번째 장면 요소를 반환합니다. 없으면 None입니다.
+    """
+    for rule in match_description(description):
+        if rule['element']:
+            return rule['element']
+    return None
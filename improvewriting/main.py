@@ -1,15 +1,38 @@
 # Firebase Cloud Functions for ImproveWriting V2
 
-import json
+import asyncio
+import os
 import random
-import time
-from firebase_functions import https_fn
+from firebase_functions import https_fn, firestore_fn, scheduler_fn
 from firebase_functions.options import set_global_options, CorsOptions
-from firebase_admin import initialize_app, firestore
-from flask import jsonify
-import requests
+from google.cloud import firestore as gcf
 
-# Firebase Admin을 함수 내에서 초기화
+import json_codec
+import timing
+from ai_helper_store import save_ai_helper, save_ai_helper_async
+from async_runtime import get_async_runtime
+from etags import CONTENT_HASH_FIELD, content_hash
+from batch_writes import commit_atomic, commit_chunked, set_write
+from image_provider import IMAGE_PROVIDER, THEMES
+from inspiration_backend import INSPIRATION_MODEL
+from inspiration_cache import INSPIRATION_CACHE, content_fingerprint, seed_for
+from keyword_rules import image_element, image_keywords
+from phases import IMAGES_ONLY, PHASES, set_phases
+from pipeline import (
+    Field, RequestError, endpoint, event_stream_response, sse_event, tagged_data_response,
+    wants_event_stream
+)
+from rate_limit import LOAD_SHEDDER
+from runtime import get_runtime, warmup
+from sentence_templates import generate_sentences
+from shared_images_cache import SHARED_IMAGES_CACHE, read_image_descriptions, read_image_descriptions_async
+from singleflight import SINGLE_FLIGHT
+from timing import stage
+from word_analytics import compute_word_analytics
+from word_archive import ARCHIVE_ENABLED, compact_all, is_archive_deletion
+from word_store import SUMMARY_SUBCOLLECTION, fetch_recent_words, fetch_recent_words_async, forget_word, record_word
+
+# Firebase Admin은 runtime.get_runtime()에서 최초 요청 시 한 번만 초기화
 
 # CORS 설정 - 특정 도메인만 허용
 cors_options = CorsOptions(
@@ -17,7 +40,25 @@ cors_options = CorsOptions(
     cors_methods=["GET", "POST", "OPTIONS"]
 )
 
-set_global_options(max_instances=10)
+# 함수별 최대 인스턴스 수 (benchmarks/load.py 용량 보고서가 이 값과 비교)
+MAX_INSTANCES = 10
+set_global_options(max_instances=MAX_INSTANCES)
+
+# generate_ai_keywords / generate_ai_sentences가 사용하는 최대 낱말 수
+INSPIRATION_WORD_LIMIT = 2
+
+# getAiInspirationForLesson을 AsyncClient 경로로 실행할지 여부 (INSPIRATION_ASYNC=1)
+ASYNC_INSPIRATION = os.environ.get('INSPIRATION_ASYNC', '0') == '1'
+# 비동기 경로의 Firestore 호출별 제한 시간 (초)
+ASYNC_CALL_TIMEOUT = float(os.environ.get('INSPIRATION_ASYNC_TIMEOUT', '5'))
+
+# startActivitiesBulk 한 번에 처리할 수 있는 최대 대상 수
+MAX_BULK_TARGETS = 200
+# generateImages에서 지금 이미지와 같은 쌍이 뽑혔을 때 다시 뽑는 최대 횟수
+REDRAW_ATTEMPTS = 3
+
+# getAiInspiration* 한 번에 돌려줄 수 있는 최대 예시 문장 수
+MAX_SUGGESTIONS = 10
 
 def get_fallback_images():
     """
@@ -31,517 +72,473 @@ def get_fallback_images():
         "alt": "Sample image 2 for creative writing"
     }
 
-# Unsplash API를 사용한 이미지 가져오기 (무료 대안)
-def get_random_images():
+# 이미지 공급자에서 이미지 가져오기 (외부 검색 API 또는 내장 Unsplash 카탈로그)
+def get_random_images(theme=None):
     """
-    무료 이미지 서비스에서 랜덤 이미지 2장을 가져옵니다.
-    Unsplash API 키가 없으면 기본 이미지를 반환합니다.
+    이미지 공급자에서 서로 다른 랜덤 이미지 2장을 가져옵니다.
+    IMAGE_PROVIDER_URL이 설정되어 있으면 캐시된 외부 검색 결과에서, 아니면 내장 카탈로그에서 고릅니다.
+    theme(예: 'mountain', 'forest', 'water')이 주어지면 해당 태그 이미지에서 고릅니다.
+    요청의 theme은 image_provider.THEMES 중 하나로 검증됩니다.
+    이미지가 부족하면 기본 이미지를 반환합니다.
     """
     try:
-        # 무료 이미지 URL들 (교육용) - 모두 다른 이미지로 구성
-        sample_images = [
-            {
-                "url": "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=800&h=600&fit=crop",
-                "alt": "Beautiful mountain landscape with clear sky"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1441974231531-c6227db76b6e?w=800&h=600&fit=crop",
-                "alt": "Peaceful forest with sunlight filtering through trees"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1472214103451-9374bd1c798e?w=800&h=600&fit=crop",
-                "alt": "Children playing in a sunny park"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1518837695005-2083093ee35b?w=800&h=600&fit=crop",
-                "alt": "Colorful flowers in a spring garden"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1469474968028-56623f02e42e?w=800&h=600&fit=crop",
-                "alt": "Serene lake with mountains in background"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1501594907352-04cda38ebc29?w=800&h=600&fit=crop",
-                "alt": "Misty morning in the mountains"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=800&h=600&fit=crop&ixid=M3w0NjI2NjJ8MHwxfGNvbGxlY3Rpb258MXwxMDcxNzc3NXx8fHx8Mnx8MTY5OTg2NzIwMA",
-                "alt": "Ocean waves at sunset"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1542273917363-3b1817f69a2d?w=800&h=600&fit=crop",
-                "alt": "City lights at night"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1598300042247-d088f8ab3a91?w=800&h=600&fit=crop",
-                "alt": "Butterfly on flower"
-            },
-            {
-                "url": "https://images.unsplash.com/photo-1506905925346-21bda4d32df4?w=800&h=600&fit=crop&rotation=90",
-                "alt": "Snow-covered pine trees"
-            }
-        ]
-        
-        # 랜덤으로 2개 선택 (중복 방지)
-        if len(sample_images) < 2:
+        pair = IMAGE_PROVIDER.pick_pair(theme)
+        if pair is None:
             # 이미지가 부족할 경우 기본 이미지 사용
             return get_fallback_images()
         
-        selected_images = random.sample(sample_images, 2)
-        # 두 이미지가 같은 URL을 가지지 않도록 확인
-        while selected_images[0]['url'] == selected_images[1]['url']:
-            selected_images = random.sample(sample_images, 2)
-        
-        return selected_images[0], selected_images[1]
+        return pair[0].as_dict(), pair[1].as_dict()
         
     except Exception as e:
         print(f"Error fetching images: {e}")
         # 기본 이미지 반환
         return get_fallback_images()
 
+def shared_images_fields(image1, image2):
+    return {
+        'url1': image1['url'],
+        'alt1': image1['alt'],
+        'url2': image2['url'],
+        'alt2': image2['alt'],
+    }
+
+def shared_images_hash(image1, image2):
+    """
+    sharedImages 내용 해시입니다 (ETag와 같은 내용 쓰기 생략에 사용).
+    """
+    return content_hash(shared_images_fields(image1, image2))
+
+def shared_images_payload(image1, image2):
+    """
+    sharedImages/current 문서에 저장할 데이터를 만듭니다.
+    """
+    return {
+        **shared_images_fields(image1, image2),
+        CONTENT_HASH_FIELD: shared_images_hash(image1, image2),
+        'updatedAt': gcf.SERVER_TIMESTAMP
+    }
+
+def activity_start_writes(runtime, collection, scope_id, image1, image2):
+    """
+    새 활동 시작에 필요한 쓰기 목록을 만듭니다.
+    - 클래스: sharedImages/current + appState/current('images_only')
+    - 레슨: sharedImages/current
+    """
+    writes = [
+        set_write(runtime.scope_doc(collection, scope_id, 'sharedImages'), shared_images_payload(image1, image2))
+    ]
+    if collection == 'classrooms':
+        writes.append(set_write(runtime.scope_doc(collection, scope_id, 'appState'), {
+            'currentPhase': IMAGES_ONLY,
+            'updatedAt': gcf.SERVER_TIMESTAMP
+        }))
+    return writes
+
 @https_fn.on_request(cors=cors_options)
-def startNewActivity(req: https_fn.Request) -> https_fn.Response:
+@endpoint(schema={
+    'classId': Field(str, required=True),
+    'theme': Field(str, choices=THEMES)
+}, coalesce=True, rate_limit=('classrooms', 'classId'))
+def startNewActivity(req: https_fn.Request, runtime, params) -> dict:
     """
     새로운 활동을 시작합니다.
-    - 클래스 ID를 받아서
+    - 클래스 ID(선택적으로 theme)를 받아서
     - 랜덤 이미지 2장을 가져와서
     - Firestore에 저장하고
     - 앱 상태를 'images_only'로 변경합니다.
     """
+    class_id = params['classId']
+    print(f"Starting new activity for class: {class_id}")
     
-    # Firebase Admin 초기화
-    try:
-        # Firebase Admin SDK 초기화 (이미 초기화된 경우 무시)
-        from firebase_admin import credentials
-        import firebase_admin
-        
-        if not firebase_admin._apps:
-            initialize_app()
-        
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        return https_fn.Response(
-            json.dumps({"error": "Firebase initialization failed"}),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+    # 랜덤 이미지 2장 가져오기
+    with stage('generate'):
+        image1, image2 = get_random_images(params['theme'])
     
-    # CORS preflight 요청은 Firebase Functions에서 자동 처리됨
+    # 이미지 저장과 앱 상태 'images_only' 변경을 한 번의 배치로 커밋 (이미지 설명 캐시도 갱신)
+    with stage('firestore_write'), SHARED_IMAGES_CACHE.updating(f'classrooms/{class_id}', [image1['alt'], image2['alt']]):
+        commit_atomic(runtime.db, activity_start_writes(runtime, 'classrooms', class_id, image1, image2))
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Only POST requests are allowed"}),
-            status=405,
-            headers={'Content-Type': 'application/json'}
-        )
+    print(f"Activity started successfully for class: {class_id}")
     
-    try:
-        # 요청 데이터 파싱
-        request_data = req.get_json()
-        
-        if not request_data or 'data' not in request_data:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid request format"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        data = request_data['data']
-        class_id = data.get('classId')
-        
-        if not class_id:
-            return https_fn.Response(
-                json.dumps({"error": "classId is required"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        print(f"Starting new activity for class: {class_id}")
-        
-        # 랜덤 이미지 2장 가져오기
-        image1, image2 = get_random_images()
-        
-        # Firestore에 이미지 저장
-        shared_images_ref = db.collection('classrooms').document(class_id).collection('sharedImages').document('current')
-        shared_images_ref.set({
-            'url1': image1['url'],
-            'alt1': image1['alt'],
-            'url2': image2['url'],
-            'alt2': image2['alt'],
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
-        # 앱 상태를 'images_only'로 변경
-        app_state_ref = db.collection('classrooms').document(class_id).collection('appState').document('current')
-        app_state_ref.set({
-            'currentPhase': 'images_only',
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
-        print(f"Activity started successfully for class: {class_id}")
-        
-        # 성공 응답
-        response_data = {
-            'data': {
-                'success': True,
-                'message': 'New activity started successfully',
-                'images': {
-                    'image1': image1,
-                    'image2': image2
-                },
-                'currentPhase': 'images_only'
-            }
-        }
-        
-        return https_fn.Response(
-            json.dumps(response_data),
-            status=200,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-    except Exception as e:
-        print(f"Error in startNewActivity: {str(e)}")
-        error_response = {
-            'error': {
-                'message': f'Internal server error: {str(e)}',
-                'code': 'internal'
-            }
-        }
-        return https_fn.Response(
-            json.dumps(error_response),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+    return tagged_data_response({
+        'success': True,
+        'message': 'New activity started successfully',
+        'images': {
+            'image1': image1,
+            'image2': image2
+        },
+        'currentPhase': IMAGES_ONLY
+    }, shared_images_hash(image1, image2))
 
 @https_fn.on_request(cors=cors_options)
-def generateImages(req: https_fn.Request) -> https_fn.Response:
+@endpoint(schema={
+    'classId': Field(str, required=True),
+    'theme': Field(str, choices=THEMES)
+}, coalesce=True, rate_limit=('classrooms', 'classId'))
+def generateImages(req: https_fn.Request, runtime, params) -> dict:
     """
     이미지를 재생성합니다.
-    - 클래스 ID를 받아서
+    - 클래스 ID(선택적으로 theme)를 받아서
     - 새로운 랜덤 이미지 2장을 가져와서
     - Firestore에 업데이트합니다.
     """
+    class_id = params['classId']
+    print(f"Regenerating images for class: {class_id}")
     
-    # Firebase Admin 초기화
-    try:
-        # Firebase Admin SDK 초기화 (이미 초기화된 경우 무시)
-        from firebase_admin import credentials
-        import firebase_admin
-        
-        if not firebase_admin._apps:
-            initialize_app()
-        
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        return https_fn.Response(
-            json.dumps({"error": "Firebase initialization failed"}),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+    # 새로운 랜덤 이미지 2장 가져오기
+    # 지금 보이는 이미지(인스턴스 캐시)가 다시 뽑히면 다시 뽑습니다 (Firestore 확인 읽기 없음).
+    scope = f'classrooms/{class_id}'
+    current = SHARED_IMAGES_CACHE.get(scope)
+    with stage('generate'):
+        image1, image2 = get_random_images(params['theme'])
+        for _ in range(REDRAW_ATTEMPTS):
+            if current != [image1['alt'], image2['alt']]:
+                break
+            image1, image2 = get_random_images(params['theme'])
     
-    # CORS preflight 요청은 Firebase Functions에서 자동 처리됨
+    # Firestore에 새 이미지 업데이트
+    shared_images_ref = runtime.scope_doc('classrooms', class_id, 'sharedImages')
+    payload = shared_images_payload(image1, image2)
+    with stage('firestore_write'), SHARED_IMAGES_CACHE.updating(scope, [image1['alt'], image2['alt']]):
+        shared_images_ref.update(payload)
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Only POST requests are allowed"}),
-            status=405,
-            headers={'Content-Type': 'application/json'}
-        )
+    print(f"Images regenerated successfully for class: {class_id}")
     
-    try:
-        # 요청 데이터 파싱
-        request_data = req.get_json()
-        
-        if not request_data or 'data' not in request_data:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid request format"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        data = request_data['data']
-        class_id = data.get('classId')
-        
-        if not class_id:
-            return https_fn.Response(
-                json.dumps({"error": "classId is required"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        print(f"Regenerating images for class: {class_id}")
-        
-        # 새로운 랜덤 이미지 2장 가져오기
-        image1, image2 = get_random_images()
-        
-        # Firestore에 새 이미지 업데이트
-        shared_images_ref = db.collection('classrooms').document(class_id).collection('sharedImages').document('current')
-        shared_images_ref.update({
-            'url1': image1['url'],
-            'alt1': image1['alt'],
-            'url2': image2['url'],
-            'alt2': image2['alt'],
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
-        print(f"Images regenerated successfully for class: {class_id}")
-        
-        # 성공 응답
-        response_data = {
-            'data': {
-                'success': True,
-                'message': 'Images regenerated successfully',
-                'images': {
-                    'image1': image1,
-                    'image2': image2
-                }
-            }
-        }
-        
-        return https_fn.Response(
-            json.dumps(response_data),
-            status=200,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-    except Exception as e:
-        print(f"Error in generateImages: {str(e)}")
-        error_response = {
-            'error': {
-                'message': f'Internal server error: {str(e)}',
-                'code': 'internal'
-            }
+    return tagged_data_response({
+        'success': True,
+        'message': 'Images regenerated successfully',
+        'images': {
+            'image1': image1,
+            'image2': image2
         }
-        return https_fn.Response(
-            json.dumps(error_response),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+    }, payload[CONTENT_HASH_FIELD])
 
 @https_fn.on_request(cors=cors_options)
-def startNewActivityForLesson(req: https_fn.Request) -> https_fn.Response:
+@endpoint(schema={
+    'lessonId': Field(str, required=True),
+    'theme': Field(str, choices=THEMES)
+}, coalesce=True, rate_limit=('lessons', 'lessonId'))
+def startNewActivityForLesson(req: https_fn.Request, runtime, params) -> dict:
     """
     레슨용 새로운 활동을 시작합니다.
-    - 레슨 ID를 받아서
+    - 레슨 ID(선택적으로 theme)를 받아서
     - 랜덤 이미지 2장을 가져와서
     - lessons/{lessonId}/sharedImages/current에 저장합니다.
     """
+    lesson_id = params['lessonId']
+    print(f"Starting new activity for lesson: {lesson_id}")
     
-    # Firebase Admin 초기화
-    try:
-        from firebase_admin import credentials
-        import firebase_admin
-        
-        if not firebase_admin._apps:
-            initialize_app()
-        
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        return https_fn.Response(
-            json.dumps({"error": "Firebase initialization failed"}),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+    # 랜덤 이미지 2장 가져오기
+    with stage('generate'):
+        image1, image2 = get_random_images(params['theme'])
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Only POST requests are allowed"}),
-            status=405,
-            headers={'Content-Type': 'application/json'}
-        )
+    # Firestore에 이미지 저장 (lessons 컬렉션 사용, 이미지 설명 캐시도 갱신)
+    with stage('firestore_write'), SHARED_IMAGES_CACHE.updating(f'lessons/{lesson_id}', [image1['alt'], image2['alt']]):
+        commit_atomic(runtime.db, activity_start_writes(runtime, 'lessons', lesson_id, image1, image2))
     
-    try:
-        # 요청 데이터 파싱
-        request_data = req.get_json()
-        
-        if not request_data or 'data' not in request_data:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid request format"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        data = request_data['data']
-        lesson_id = data.get('lessonId')
-        
-        if not lesson_id:
-            return https_fn.Response(
-                json.dumps({"error": "lessonId is required"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        print(f"Starting new activity for lesson: {lesson_id}")
-        
-        # 랜덤 이미지 2장 가져오기
-        image1, image2 = get_random_images()
-        
-        # Firestore에 이미지 저장 (lessons 컬렉션 사용)
-        shared_images_ref = db.collection('lessons').document(lesson_id).collection('sharedImages').document('current')
-        shared_images_ref.set({
-            'url1': image1['url'],
-            'alt1': image1['alt'],
-            'url2': image2['url'],
-            'alt2': image2['alt'],
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
-        print(f"Activity started successfully for lesson: {lesson_id}")
-        
-        # 성공 응답
-        response_data = {
-            'data': {
-                'success': True,
-                'message': 'New lesson activity started successfully',
-                'images': {
-                    'image1': image1,
-                    'image2': image2
-                }
-            }
+    print(f"Activity started successfully for lesson: {lesson_id}")
+    
+    return tagged_data_response({
+        'success': True,
+        'message': 'New lesson activity started successfully',
+        'images': {
+            'image1': image1,
+            'image2': image2
         }
-        
-        return https_fn.Response(
-            json.dumps(response_data),
-            status=200,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-    except Exception as e:
-        print(f"Error in startNewActivityForLesson: {str(e)}")
-        error_response = {
-            'error': {
-                'message': f'Internal server error: {str(e)}',
-                'code': 'internal'
-            }
+    }, shared_images_hash(image1, image2))
+
+def _normalize_ids(values):
+    """
+    요청의 ID 목록에서 빈 값과 중복을 제거합니다 (순서 유지).
+    """
+    return list(dict.fromkeys(v for v in values or [] if v))
+
+@https_fn.on_request(cors=cors_options)
+@endpoint(schema={
+    'classIds': Field(list, default=[], item_kind=str),
+    'lessonIds': Field(list, default=[], item_kind=str),
+    'theme': Field(str, choices=THEMES)
+})
+def startActivitiesBulk(req: https_fn.Request, runtime, params) -> dict:
+    """
+    여러 클래스/레슨의 새 활동을 한 번에 시작합니다.
+    - classIds, lessonIds 목록(선택적으로 theme)을 받아서
+    - 대상마다 랜덤 이미지 2장을 고르고
+    - 최대 500개 쓰기 단위의 배치로 나누어 저장한 뒤
+    - 대상별 결과를 반환합니다.
+    """
+    targets = (
+        [('classrooms', class_id) for class_id in _normalize_ids(params['classIds'])] +
+        [('lessons', lesson_id) for lesson_id in _normalize_ids(params['lessonIds'])]
+    )
+    
+    if not targets:
+        raise RequestError("classIds or lessonIds is required")
+    if len(targets) > MAX_BULK_TARGETS:
+        raise RequestError(f"At most {MAX_BULK_TARGETS} targets are allowed")
+    
+    print(f"Starting activities in bulk for {len(targets)} targets")
+    
+    # 대상마다 이미지 2장 선택 (한 번의 순회)
+    selections = {}
+    groups = []
+    with stage('generate'):
+        for target in targets:
+            collection, scope_id = target
+            image1, image2 = get_random_images(params['theme'])
+            selections[target] = (image1, image2)
+            groups.append((target, activity_start_writes(runtime, collection, scope_id, image1, image2)))
+    
+    # 대상별 쓰기가 나뉘지 않도록 배치 단위로 커밋
+    with stage('firestore_write'):
+        for collection, scope_id in targets:
+            SHARED_IMAGES_CACHE.invalidate(f'{collection}/{scope_id}')
+        errors = commit_chunked(runtime.db, groups)
+    
+    results = []
+    for target in targets:
+        collection, scope_id = target
+        image1, image2 = selections[target]
+        result = {
+            'type': 'class' if collection == 'classrooms' else 'lesson',
+            'id': scope_id,
+            'success': errors.get(target) is None
         }
-        return https_fn.Response(
-            json.dumps(error_response),
-            status=500,
-            headers={'Content-Type': 'application/json'}
+        if result['success']:
+            result['images'] = {'image1': image1, 'image2': image2}
+            SHARED_IMAGES_CACHE.store(f'{collection}/{scope_id}', [image1['alt'], image2['alt']])
+        else:
+            result['error'] = errors[target]
+        results.append(result)
+    
+    succeeded = sum(1 for result in results if result['success'])
+    print(f"Bulk activities started: {succeeded}/{len(results)} succeeded")
+    
+    # 일부 실패도 200으로 대상별 결과 반환
+    return {
+        'success': succeeded == len(results),
+        'message': f'{succeeded} of {len(results)} activities started',
+        'results': results
+    }
+
+@https_fn.on_request(cors=cors_options)
+@endpoint(schema={
+    'phase': Field(str, required=True, choices=PHASES),
+    'classId': Field(str),
+    'lessonId': Field(str),
+    'classIds': Field(list, default=[], item_kind=str),
+    'lessonIds': Field(list, default=[], item_kind=str),
+    'force': Field(bool, default=False)
+})
+def setPhase(req: https_fn.Request, runtime, params) -> dict:
+    """
+    클래스/레슨 하나 또는 여러 개의 활동 단계를 한 번에 바꿉니다.
+    - phase와 classId/lessonId 또는 classIds/lessonIds 목록을 받아서
+    - 현재 단계를 한 번에 읽고 허용된 단계 이동인지 확인한 뒤 (force=true이면 확인 생략)
+    - 바꿀 대상만 WriteBatch 하나로 원자적으로 커밋하고
+      (쓰기 하나가 실패해 배치가 거부되면 대상마다 다시 커밋해 실패한 대상만 따로 표시)
+    - 대상별 결과를 반환합니다.
+    """
+    targets = (
+        [('classrooms', class_id) for class_id in _normalize_ids([params['classId']] + params['classIds'])] +
+        [('lessons', lesson_id) for lesson_id in _normalize_ids([params['lessonId']] + params['lessonIds'])]
+    )
+    
+    if not targets:
+        raise RequestError("classId, lessonId, classIds or lessonIds is required")
+    if len(targets) > MAX_BULK_TARGETS:
+        raise RequestError(f"At most {MAX_BULK_TARGETS} targets are allowed")
+    
+    phase = params['phase']
+    print(f"Setting phase '{phase}' for {len(targets)} targets")
+    
+    with stage('firestore_write'):
+        results = set_phases(runtime, targets, phase, force=params['force'])
+    
+    succeeded = sum(1 for result in results if result['success'])
+    print(f"Phase set: {succeeded}/{len(results)} succeeded")
+    
+    # 일부 실패도 200으로 대상별 결과 반환
+    return {
+        'success': succeeded == len(results),
+        'message': f'{succeeded} of {len(results)} targets are in phase {phase}',
+        'currentPhase': phase,
+        'results': results
+    }
+
+def _read_lesson_inputs(runtime, lesson_id, async_runtime=None):
+    """
+    레슨의 최근 낱말과 현재 이미지 설명을 읽습니다.
+    비동기 런타임이 있으면 두 읽기를 동시에 진행합니다 (지연 시간 = 두 읽기 중 긴 쪽).
+    """
+    if async_runtime is not None:
+        return async_runtime.run(
+            _read_lesson_inputs_async(async_runtime, lesson_id),
+            timeout=ASYNC_CALL_TIMEOUT * 2
         )
+    
+    # 최근 제출된 낱말들 가져오기 (필요한 개수만, text 필드만)
+    words = fetch_recent_words(runtime, 'lessons', lesson_id, INSPIRATION_WORD_LIMIT)
+    
+    # 현재 이미지 정보 가져오기 (같은 인스턴스가 최근에 읽거나 쓴 값이면 캐시 사용)
+    return words, read_image_descriptions(runtime, 'lessons', lesson_id)
+
+async def _read_lesson_inputs_async(async_runtime, lesson_id):
+    """
+    레슨의 최근 낱말과 현재 이미지 설명을 동시에 읽습니다.
+    """
+    return await asyncio.gather(
+        fetch_recent_words_async(async_runtime, 'lessons', lesson_id, INSPIRATION_WORD_LIMIT, timeout=ASYNC_CALL_TIMEOUT),
+        read_image_descriptions_async(async_runtime, 'lessons', lesson_id, ASYNC_CALL_TIMEOUT)
+    )
+
+def generate_inspiration(scope, words, image_descriptions=None, count=1, seed=None):
+    """
+    낱말/이미지 설명으로 키워드와 예시 문장을 생성합니다.
+    (ai_content, 캐시 키, 캐시 적중 여부)를 반환합니다.
+    같은 낱말/이미지 조합(과 count/seed)이면 캐시된 결과를 그대로 사용합니다.
+    count > 1이면 서로 다른 문장 목록을 exampleSentences로 함께 돌려줍니다.
+    모델 서버(INSPIRATION_MODEL_URL)가 있으면 먼저 묻고, 지연 예산 안에 답이 없으면
+    규칙 엔진이 답합니다. 이때는 다음 요청이 모델을 다시 시도하도록 캐시 키를 None으로 돌려줍니다.
+    """
+    fingerprint = content_fingerprint(scope, words, image_descriptions)
+    cache_key = fingerprint if count == 1 and seed is None else f'{fingerprint}:{count}:{seed}'
+    ai_content = INSPIRATION_CACHE.get(cache_key)
+    if ai_content is not None:
+        return ai_content, cache_key, True
+    
+    # 지문에서 만든 시드로 같은 내용이면 같은 문장을 재현 (요청 seed로 다른 조합을 고를 수 있음)
+    if INSPIRATION_MODEL is not None:
+        model_content = INSPIRATION_MODEL.generate(scope, words, image_descriptions, count=count, seed=seed)
+        if model_content is not None:
+            keywords = model_content['keywords']
+            sentences = list(dict.fromkeys(model_content['sentences']))[:count]
+        else:
+            cache_key = None
+    
+    if INSPIRATION_MODEL is None or model_content is None:
+        rng = random.Random(seed_for(fingerprint) if seed is None else seed_for(fingerprint) ^ seed)
+        keywords = generate_ai_keywords(words, image_descriptions)
+        sentences = generate_ai_sentences(words, keywords, image_descriptions, count=count, rng=rng)
+    ai_content = {
+        'keywords': keywords,
+        'exampleSentence': sentences[0]
+    }
+    if count > 1:
+        ai_content['exampleSentences'] = sentences
+    return ai_content, cache_key, False
+
+def remember_inspiration(cache_key, ai_content):
+    """
+    저장이 끝난 영감 결과를 캐시에 넣습니다 (모델 대신 규칙 엔진이 답한 결과는 제외).
+    """
+    if cache_key is not None:
+        INSPIRATION_CACHE.put(cache_key, ai_content)
+
+def inspiration_response(ai_content):
+    return {
+        'success': True,
+        'message': 'AI inspiration generated successfully',
+        'content': ai_content
+    }
+
+def tagged_inspiration_response(ai_content):
+    """
+    aiHelper contentHash를 ETag로 붙인 응답을 만듭니다.
+    """
+    return tagged_data_response(inspiration_response(ai_content), content_hash(ai_content))
+
+def inspiration_event_stream(runtime, collection, scope_id, read_inputs, params):
+    """
+    AI 영감을 server-sent events로 조금씩 보냅니다 (data.stream=true 또는 Accept: text/event-stream).
+    - 헤더와 첫 바이트는 Firestore 읽기 전에 바로 나갑니다.
+    - keywords → sentence 이벤트로 내용을 먼저 보내고,
+    - aiHelper 저장은 내용을 보낸 뒤에 진행해 끝나면 done 이벤트를 보냅니다.
+    - 도중에 실패하면 error 이벤트를 보냅니다 (상태 코드는 이미 200으로 나갔으므로).
+    """
+    def events():
+        yield b': inspiration stream\n\n'
+        try:
+            words, image_descriptions = read_inputs()
+            ai_content, cache_key, cached = generate_inspiration(
+                f'{collection}/{scope_id}', words, image_descriptions, count=params['count'], seed=params['seed']
+            )
+            yield sse_event('keywords', {'keywords': ai_content['keywords']})
+            sentence = {'exampleSentence': ai_content['exampleSentence']}
+            if 'exampleSentences' in ai_content:
+                sentence['exampleSentences'] = ai_content['exampleSentences']
+            yield sse_event('sentence', sentence)
+            
+            if not cached:
+                save_ai_helper(runtime.scope_doc(collection, scope_id, 'aiHelper'), ai_content)
+                remember_inspiration(cache_key, ai_content)
+            print(f"AI inspiration streamed for {collection}/{scope_id} (cached: {cached})")
+            yield sse_event('done', inspiration_response(ai_content))
+        except Exception as e:
+            print(f"Error streaming AI inspiration for {collection}/{scope_id}: {e}")
+            yield sse_event('error', {'message': f'Internal server error: {str(e)}', 'code': 'internal'})
+    
+    return event_stream_response(events())
 
 @https_fn.on_request(cors=cors_options)
-def getAiInspirationForLesson(req: https_fn.Request) -> https_fn.Response:
+@endpoint(schema={
+    'lessonId': Field(str, required=True),
+    'count': Field(int, default=1, min_value=1, max_value=MAX_SUGGESTIONS),
+    'seed': Field(int),
+    'stream': Field(bool, default=False)
+}, coalesce=lambda req, params: not wants_event_stream(req, params), rate_limit=('lessons', 'lessonId'))
+def getAiInspirationForLesson(req: https_fn.Request, runtime, params):
     """
     레슨을 위한 AI 영감을 생성합니다.
     - 레슨 ID를 받아서
     - 현재 제출된 낱말들을 분석하여
     - AI가 생성한 키워드와 예시 문장을 제공합니다.
+    - count(최대 MAX_SUGGESTIONS)를 주면 서로 다른 예시 문장 여러 개를 한 번에 돌려줍니다.
+    - stream=true이면 내용을 server-sent events로 먼저 보내고 저장은 그 뒤에 합니다.
     """
+    lesson_id = params['lessonId']
+    print(f"Getting AI inspiration for lesson: {lesson_id}")
     
-    # Firebase Admin 초기화
-    try:
-        from firebase_admin import credentials
-        import firebase_admin
-        
-        if not firebase_admin._apps:
-            initialize_app()
-        
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        return https_fn.Response(
-            json.dumps({"error": "Firebase initialization failed"}),
-            status=500,
-            headers={'Content-Type': 'application/json'}
+    async_runtime = get_async_runtime() if ASYNC_INSPIRATION else None
+    
+    if wants_event_stream(req, params):
+        return inspiration_event_stream(
+            runtime, 'lessons', lesson_id, lambda: _read_lesson_inputs(runtime, lesson_id, async_runtime), params
         )
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Only POST requests are allowed"}),
-            status=405,
-            headers={'Content-Type': 'application/json'}
+    with stage('firestore_read'):
+        words, image_descriptions = _read_lesson_inputs(runtime, lesson_id, async_runtime)
+    
+    # AI 영감 생성 (이미지 설명과 제출된 낱말들을 둘 다 고려)
+    with stage('generate'):
+        ai_content, fingerprint, cached = generate_inspiration(
+            f'lessons/{lesson_id}', words, image_descriptions, count=params['count'], seed=params['seed']
         )
     
-    try:
-        # 요청 데이터 파싱
-        request_data = req.get_json()
-        
-        if not request_data or 'data' not in request_data:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid request format"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        data = request_data['data']
-        lesson_id = data.get('lessonId')
-        
-        if not lesson_id:
-            return https_fn.Response(
-                json.dumps({"error": "lessonId is required"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        print(f"Getting AI inspiration for lesson: {lesson_id}")
-        
-        # 현재 제출된 낱말들 가져오기
-        words_ref = db.collection('lessons').document(lesson_id).collection('words')
-        words_docs = words_ref.stream()
-        words = [doc.to_dict().get('text', '') for doc in words_docs]
-        
-        # 현재 이미지 정보 가져오기
-        shared_images_ref = db.collection('lessons').document(lesson_id).collection('sharedImages').document('current')
-        images_doc = shared_images_ref.get()
-        image_descriptions = []
-        
-        if images_doc.exists():
-            image_data = images_doc.to_dict()
-            image_descriptions = [
-                image_data.get('alt1', ''),
-                image_data.get('alt2', '')
-            ]
-        
-        # AI 영감 생성 (이미지 설명과 제출된 낱말들을 둘 다 고려)
-        keywords = generate_ai_keywords(words, image_descriptions)
-        example_sentence = generate_ai_sentence(words, keywords, image_descriptions)
-        
-        # AI 도우미 데이터를 Firestore에 저장
-        ai_helper_ref = db.collection('lessons').document(lesson_id).collection('aiHelper').document('current')
-        ai_content = {
-            'keywords': keywords,
-            'exampleSentence': example_sentence
-        }
-        
-        ai_helper_ref.set({
-            'content': json.dumps(ai_content, ensure_ascii=False),
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
+    if cached:
+        print(f"AI inspiration served from cache for lesson: {lesson_id}")
+        return tagged_inspiration_response(ai_content)
+    
+    # AI 도우미 데이터를 Firestore에 저장 (같으면 생략, 문장만 바뀌면 병합 쓰기)
+    if async_runtime is None:
+        with stage('firestore_write'):
+            save_ai_helper(runtime.scope_doc('lessons', lesson_id, 'aiHelper'), ai_content)
+        remember_inspiration(fingerprint, ai_content)
         print(f"AI inspiration generated for lesson: {lesson_id}")
-        
-        # 성공 응답
-        response_data = {
-            'data': {
-                'success': True,
-                'message': 'AI inspiration generated successfully',
-                'content': ai_content
-            }
-        }
-        
-        return https_fn.Response(
-            json.dumps(response_data, ensure_ascii=False),
-            status=200,
-            headers={'Content-Type': 'application/json; charset=utf-8'}
-        )
-        
-    except Exception as e:
-        print(f"Error in getAiInspirationForLesson: {str(e)}")
-        error_response = {
-            'error': {
-                'message': f'Internal server error: {str(e)}',
-                'code': 'internal'
-            }
-        }
-        return https_fn.Response(
-            json.dumps(error_response),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+        return tagged_inspiration_response(ai_content)
+    
+    # 쓰기는 응답 직렬화와 겹쳐서 진행하고, 반환 직전에 완료를 확인
+    ai_helper_ref = async_runtime.scope_doc('lessons', lesson_id, 'aiHelper')
+    write_future = async_runtime.submit(
+        save_ai_helper_async(ai_helper_ref, ai_content, ASYNC_CALL_TIMEOUT)
+    )
+    with stage('serialize'):
+        response = tagged_inspiration_response(ai_content)
+    with stage('firestore_write'):
+        write_future.result(ASYNC_CALL_TIMEOUT * 2)
+    remember_inspiration(fingerprint, ai_content)
+    print(f"AI inspiration generated for lesson: {lesson_id}")
+    return response
 
 def generate_ai_keywords(words, image_descriptions=None):
     """
@@ -551,25 +548,13 @@ def generate_ai_keywords(words, image_descriptions=None):
     
     # 1. 이미지 설명 기반 키워드 추출
     if image_descriptions:
-        image_keywords = []
+        found_keywords = []
         for desc in image_descriptions:
             if desc:
-                desc_lower = desc.lower()
-                # 자연 관련 단어 추출
-                if any(word in desc_lower for word in ['mountain', 'landscape', '산', '풍경']):
-                    image_keywords.extend(['높이', '웅장한', '고요한'])
-                if any(word in desc_lower for word in ['forest', 'tree', '나무', '숲']):
-                    image_keywords.extend(['생명력', '초록색', '신선한'])
-                if any(word in desc_lower for word in ['child', 'play', '아이', '놀이']):
-                    image_keywords.extend(['즐거운', '활기찬', '순수한'])
-                if any(word in desc_lower for word in ['flower', 'garden', '꽃', '정원']):
-                    image_keywords.extend(['화려한', '예쁜', '향기로운'])
-                if any(word in desc_lower for word in ['lake', 'water', '물', '호수']):
-                    image_keywords.extend(['맑은', '서늘한', '평화로운'])
-                if any(word in desc_lower for word in ['sun', 'light', '햇빛', '빛']):
-                    image_keywords.extend(['밝은', '따뜻한', '찬란한'])
+                # 규칙 표의 모든 개념을 한 번의 스캔으로 찾습니다.
+                found_keywords.extend(image_keywords(desc))
         
-        keywords.extend(list(set(image_keywords))[:4])  # 중복 제거 후 최대 4개
+        keywords.extend(list(dict.fromkeys(found_keywords))[:4])  # 중복 제거 후 최대 4개
     
     # 2. 제출된 낱말 기반 키워드
     if words:
@@ -584,164 +569,208 @@ def generate_ai_keywords(words, image_descriptions=None):
     
     return keywords[:6]  # 최대 6개 반환
 
-def generate_ai_sentence(words, keywords, image_descriptions=None):
+def image_elements_from(image_descriptions):
     """
-    이미지 설명, 낱말들, 키워드를 기반으로 예시 문장을 생성합니다.
+    이미지 설명에서 예시 문장에 넣을 장면 요소를 추출합니다.
     """
-    # 이미진 설명에서 주요 요소 추출
     image_elements = []
     if image_descriptions:
         for desc in image_descriptions:
             if desc:
-                desc_lower = desc.lower()
-                if any(word in desc_lower for word in ['mountain', '산']):
-                    image_elements.append('산')
-                elif any(word in desc_lower for word in ['forest', 'tree', '나무']):
-                    image_elements.append('숲')
-                elif any(word in desc_lower for word in ['child', 'play', '아이']):
-                    image_elements.append('아이들')
-                elif any(word in desc_lower for word in ['flower', 'garden', '꽃']):
-                    image_elements.append('꽃밭')
-                elif any(word in desc_lower for word in ['lake', 'water', '물']):
-                    image_elements.append('물가')
-    
-    # 문장 템플릿 선택
-    if not words and not image_elements:
-        return "이미지를 보며 떠오르는 감정과 생각을 자유롭게 표현해보세요."
-    
-    # 이미지와 낱말을 결합한 다양한 템플릿
-    templates = []
-    
-    if image_elements and words:
-        # 이미지 + 낱말 + 키워드
-        templates.extend([
-            f"{image_elements[0]}에서 {words[0]}을(를) 발견한 순간, {random.choice(keywords)} 마음이 들었습니다.",
-            f"{random.choice(keywords)} {image_elements[0]}에서 {', '.join(words[:2])}이(가) 춤추고 있는 것 같아요.",
-            f"만약 내가 이 {image_elements[0]}에 있다면, {words[0]}과 함께 {random.choice(keywords)} 시간을 보내고 싶어요."
-        ])
-    elif image_elements:
-        # 이미지 + 키워드
-        templates.extend([
-            f"이 {image_elements[0]}를 보면 {random.choice(keywords)} 느낌이 듭니다.",
-            f"{random.choice(keywords)} {image_elements[0]}에서 어떤 이야기가 펼쳐질까요?",
-            f"{image_elements[0]} 속에서 {random.choice(keywords)} 모험을 상상해보세요."
-        ])
-    elif words:
-        # 낱말 + 키워드
-        templates.extend([
-            f"이 {', '.join(words[:2])}를 보니 {random.choice(keywords)} 느낌이 듭니다.",
-            f"{words[0] if words else '이미지'}에서 {random.choice(keywords)} 이야기가 시작될 것 같습니다."
-        ])
-    
-    if templates:
-        return random.choice(templates)
-    else:
-        return "이미지를 보며 떠오르는 감정과 생각을 자유롭게 표현해보세요."
+                element = image_element(desc)
+                if element:
+                    image_elements.append(element)
+    return image_elements
+
+def generate_ai_sentences(words, keywords, image_descriptions=None, count=1, rng=random):
+    """
+    이미지 설명, 낱말들, 키워드를 기반으로 서로 다른 예시 문장을 최대 count개 생성합니다.
+    템플릿은 sentence_templates 모듈에서 한 번만 컴파일됩니다.
+    """
+    return generate_sentences(words, keywords, image_elements_from(image_descriptions), count=count, rng=rng)
+
+def generate_ai_sentence(words, keywords, image_descriptions=None, rng=random):
+    """
+    이미지 설명, 낱말들, 키워드를 기반으로 예시 문장을 생성합니다.
+    rng에 시드가 고정된 random.Random을 넘기면 같은 결과를 재현할 수 있습니다.
+    """
+    return generate_ai_sentences(words, keywords, image_descriptions, count=1, rng=rng)[0]
 
 @https_fn.on_request(cors=cors_options)
-def getAiInspiration(req: https_fn.Request) -> https_fn.Response:
+@endpoint(schema={
+    'classId': Field(str, required=True),
+    'count': Field(int, default=1, min_value=1, max_value=MAX_SUGGESTIONS),
+    'seed': Field(int),
+    'stream': Field(bool, default=False)
+}, coalesce=lambda req, params: not wants_event_stream(req, params), rate_limit=('classrooms', 'classId'))
+def getAiInspiration(req: https_fn.Request, runtime, params) -> dict:
     """
     클래스를 위한 AI 영감을 생성합니다.
     - 클래스 ID를 받아서
     - 현재 제출된 낱말들을 분석하여
     - AI가 생성한 키워드와 예시 문장을 제공합니다.
+    - count(최대 MAX_SUGGESTIONS)를 주면 서로 다른 예시 문장 여러 개를 한 번에 돌려줍니다.
+    - stream=true이면 내용을 server-sent events로 먼저 보내고 저장은 그 뒤에 합니다.
     """
+    class_id = params['classId']
+    print(f"Getting AI inspiration for class: {class_id}")
     
-    # Firebase Admin 초기화
-    try:
-        from firebase_admin import credentials
-        import firebase_admin
-        
-        if not firebase_admin._apps:
-            initialize_app()
-        
-        db = firestore.client()
-    except Exception as e:
-        print(f"Firebase initialization error: {e}")
-        return https_fn.Response(
-            json.dumps({"error": "Firebase initialization failed"}),
-            status=500,
-            headers={'Content-Type': 'application/json'}
+    if wants_event_stream(req, params):
+        return inspiration_event_stream(
+            runtime, 'classrooms', class_id,
+            lambda: (fetch_recent_words(runtime, 'classrooms', class_id, INSPIRATION_WORD_LIMIT), None), params
         )
     
-    if req.method != 'POST':
-        return https_fn.Response(
-            json.dumps({"error": "Only POST requests are allowed"}),
-            status=405,
-            headers={'Content-Type': 'application/json'}
+    # 최근 제출된 낱말들 가져오기 (classrooms 컬렉션 사용, 필요한 개수만)
+    with stage('firestore_read'):
+        words = fetch_recent_words(runtime, 'classrooms', class_id, INSPIRATION_WORD_LIMIT)
+    
+    # AI 영감 생성 (실제 AI API 대신 규칙 기반으로 구현)
+    with stage('generate'):
+        ai_content, fingerprint, cached = generate_inspiration(
+            f'classrooms/{class_id}', words, count=params['count'], seed=params['seed']
         )
     
-    try:
-        # 요청 데이터 파싱
-        request_data = req.get_json()
-        
-        if not request_data or 'data' not in request_data:
-            return https_fn.Response(
-                json.dumps({"error": "Invalid request format"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        data = request_data['data']
-        class_id = data.get('classId')
-        
-        if not class_id:
-            return https_fn.Response(
-                json.dumps({"error": "classId is required"}),
-                status=400,
-                headers={'Content-Type': 'application/json'}
-            )
-        
-        print(f"Getting AI inspiration for class: {class_id}")
-        
-        # 현재 제출된 낱말들 가져오기 (classrooms 컬렉션 사용)
-        words_ref = db.collection('classrooms').document(class_id).collection('words')
-        words_docs = words_ref.stream()
-        words = [doc.to_dict().get('text', '') for doc in words_docs]
-        
-        # AI 영감 생성 (실제 AI API 대신 규칙 기반으로 구현)
-        keywords = generate_ai_keywords(words)
-        example_sentence = generate_ai_sentence(words, keywords)
-        
-        # AI 도우미 데이터를 Firestore에 저장
-        ai_helper_ref = db.collection('classrooms').document(class_id).collection('aiHelper').document('current')
-        ai_content = {
-            'keywords': keywords,
-            'exampleSentence': example_sentence
-        }
-        
-        ai_helper_ref.set({
-            'content': json.dumps(ai_content, ensure_ascii=False),
-            'updatedAt': firestore.SERVER_TIMESTAMP
-        })
-        
+    if cached:
+        print(f"AI inspiration served from cache for class: {class_id}")
+    else:
+        # AI 도우미 데이터를 Firestore에 저장 (같으면 생략, 문장만 바뀌면 병합 쓰기)
+        with stage('firestore_write'):
+            save_ai_helper(runtime.scope_doc('classrooms', class_id, 'aiHelper'), ai_content)
+        remember_inspiration(fingerprint, ai_content)
         print(f"AI inspiration generated for class: {class_id}")
-        
-        # 성공 응답
-        response_data = {
-            'data': {
-                'success': True,
-                'message': 'AI inspiration generated successfully',
-                'content': ai_content
-            }
-        }
-        
-        return https_fn.Response(
-            json.dumps(response_data, ensure_ascii=False),
-            status=200,
-            headers={'Content-Type': 'application/json; charset=utf-8'}
-        )
-        
+    
+    return tagged_inspiration_response(ai_content)
+
+def word_analytics_response(summary):
+    return {
+        'success': True,
+        'message': 'Word analytics computed successfully',
+        'analytics': summary
+    }
+
+@https_fn.on_request(cors=cors_options)
+@endpoint(schema={
+    'classId': Field(str, required=True)
+}, coalesce=True, rate_limit=('classrooms', 'classId'))
+def computeWordAnalytics(req: https_fn.Request, runtime, params) -> dict:
+    """
+    클래스의 낱말 분석 요약을 계산합니다.
+    - 낱말을 페이지 단위로 읽어 빈도, 학생별 참여, 함께 나온 낱말 쌍을 집계하고
+    - classrooms/{classId}/wordAnalytics/current 문서 하나에 저장합니다.
+    """
+    class_id = params['classId']
+    with stage('analytics'):
+        summary = compute_word_analytics(runtime, 'classrooms', class_id)
+    print(f"Word analytics computed for class: {class_id} ({summary['totalWords']} words)")
+    return word_analytics_response(summary)
+
+@https_fn.on_request(cors=cors_options)
+@endpoint(schema={
+    'lessonId': Field(str, required=True)
+}, coalesce=True, rate_limit=('lessons', 'lessonId'))
+def computeWordAnalyticsForLesson(req: https_fn.Request, runtime, params) -> dict:
+    """
+    레슨의 낱말 분석 요약을 계산합니다.
+    - lessons/{lessonId}/wordAnalytics/current 문서 하나에 저장합니다.
+    """
+    lesson_id = params['lessonId']
+    with stage('analytics'):
+        summary = compute_word_analytics(runtime, 'lessons', lesson_id)
+    print(f"Word analytics computed for lesson: {lesson_id} ({summary['totalWords']} words)")
+    return word_analytics_response(summary)
+
+@https_fn.on_request(cors=cors_options)
+@endpoint(methods=('GET', 'POST'), needs_runtime=False)
+def warmupInstance(req: https_fn.Request, runtime, params) -> dict:
+    """
+    인스턴스 헬스 체크 및 워밍업을 수행합니다.
+    - Firebase 런타임을 미리 초기화하여
+    - 수업 시작 시 첫 요청이 초기화 비용을 치르지 않도록 합니다.
+    파이프라인이 런타임을 먼저 만들지 않으므로 wasWarm이 콜드 스타트를 그대로 보여줍니다.
+    """
+    status = warmup()
+    status['inspirationCache'] = INSPIRATION_CACHE.stats()
+    status['jsonBackend'] = json_codec.BACKEND
+    status['timings'] = timing.snapshot()
+    status['singleFlight'] = SINGLE_FLIGHT.stats()
+    status['rateLimit'] = LOAD_SHEDDER.stats()
+    status['imageProvider'] = IMAGE_PROVIDER.stats()
+    status['sharedImagesCache'] = SHARED_IMAGES_CACHE.stats()
+    status['inspirationModel'] = INSPIRATION_MODEL.stats() if INSPIRATION_MODEL is not None else None
+    return status
+
+def _record_word_summary(event, collection):
+    """
+    낱말 문서 생성 시 최근 낱말 요약 문서에 추가합니다.
+    """
+    scope_id = event.params['scopeId']
+    word = event.data
+    if word is None or not word.exists:
+        return
+    try:
+        runtime = get_runtime()
+        data = word.to_dict()
+        record_word(runtime.db, runtime.scope_doc(collection, scope_id, SUMMARY_SUBCOLLECTION),
+                    event.params['wordId'], data.get('text', ''), data.get('createdAt'))
     except Exception as e:
-        print(f"Error in getAiInspiration: {str(e)}")
-        error_response = {
-            'error': {
-                'message': f'Internal server error: {str(e)}',
-                'code': 'internal'
-            }
-        }
-        return https_fn.Response(
-            json.dumps(error_response),
-            status=500,
-            headers={'Content-Type': 'application/json'}
-        )
+        # 요약에서 빠진 낱말은 읽기 쪽이 쿼리로 대신 읽습니다 (목록이 모자라면).
+        print(f"Error recording word summary for {collection}/{scope_id}: {str(e)}")
+
+def _forget_word_summary(event, collection):
+    """
+    낱말 문서 삭제 시 최근 낱말 요약 문서에서 지웁니다.
+    """
+    scope_id = event.params['scopeId']
+    word = event.data
+    # 보관 작업이 표시를 남기고 옮긴 낱말은 요약에서 지우지 않습니다 (여전히 최근 낱말로 읽힘).
+    # 교사가 지운 낱말은 나이와 상관없이 지웁니다.
+    if word is not None and word.exists and is_archive_deletion(word.to_dict()):
+        return
+    try:
+        runtime = get_runtime()
+        forget_word(runtime.db, runtime.scope_doc(collection, scope_id, SUMMARY_SUBCOLLECTION), event.params['wordId'])
+    except Exception as e:
+        print(f"Error forgetting word summary for {collection}/{scope_id}: {str(e)}")
+
+@firestore_fn.on_document_created(document='lessons/{scopeId}/words/{wordId}')
+def addLessonWordSummary(event: firestore_fn.Event) -> None:
+    """
+    lessons/{lessonId}/wordSummary/current에 새 낱말을 추가합니다.
+    """
+    _record_word_summary(event, 'lessons')
+
+@firestore_fn.on_document_deleted(document='lessons/{scopeId}/words/{wordId}')
+def removeLessonWordSummary(event: firestore_fn.Event) -> None:
+    """
+    lessons/{lessonId}/wordSummary/current에서 삭제된 낱말을 지웁니다.
+    """
+    _forget_word_summary(event, 'lessons')
+
+@firestore_fn.on_document_created(document='classrooms/{scopeId}/words/{wordId}')
+def addClassWordSummary(event: firestore_fn.Event) -> None:
+    """
+    classrooms/{classId}/wordSummary/current에 새 낱말을 추가합니다.
+    """
+    _record_word_summary(event, 'classrooms')
+
+@firestore_fn.on_document_deleted(document='classrooms/{scopeId}/words/{wordId}')
+def removeClassWordSummary(event: firestore_fn.Event) -> None:
+    """
+    classrooms/{classId}/wordSummary/current에서 삭제된 낱말을 지웁니다.
+    """
+    _forget_word_summary(event, 'classrooms')
+
+@scheduler_fn.on_schedule(schedule='every day 03:00', timezone=scheduler_fn.Timezone('Asia/Seoul'), timeout_sec=540)
+def compactWordArchives(event: scheduler_fn.ScheduledEvent) -> None:
+    """
+    매일 새벽 오래된 낱말을 보관 문서로 옮깁니다.
+    - WORD_ARCHIVE_AGE_HOURS보다 오래된 words 문서를 400개씩 wordArchive 문서 하나로 묶고
+    - 원본에 보관 표시를 남긴 뒤 보관 문서 쓰기와 같은 배치에서 삭제합니다.
+    WORD_ARCHIVE_ENABLED=1일 때만 실행합니다 (웹 화면이 wordArchive를 읽기 전까지는 꺼 둠).
+    """
+    if not ARCHIVE_ENABLED:
+        print("Word archive compaction is disabled (WORD_ARCHIVE_ENABLED != 1)")
+        return
+    summary = compact_all(get_runtime())
+    print(f"Word archive compaction finished: {summary}")
@@ -0,0 +1,127 @@
+# 활동 단계(phase) 상태 기계 + 여러 클래스/레슨 단계 한꺼번에 바꾸기
+
+from google.api_core import exceptions
+from google.cloud import firestore as gcf
+
+from batch_writes import commit_atomic, commit_chunked, set_write, update_write
+
+WAITING = 'waiting'
+IMAGES_ONLY = 'images_only'
+WORD_INPUT_ACTIVE = 'word_input_active'
+SENTENCE_INPUT_ACTIVE = 'sentence_input_active'
+COMPLETED = 'completed'
+
+PHASES = (WAITING, IMAGES_ONLY, WORD_INPUT_ACTIVE, SENTENCE_INPUT_ACTIVE, COMPLETED)
+
+# 허용되는 단계 이동 (한 단계 앞/뒤, 처음으로 되돌리기)
+TRANSITIONS = {
+    WAITING: {IMAGES_ONLY},
+    IMAGES_ONLY: {WAITING, WORD_INPUT_ACTIVE},
+    WORD_INPUT_ACTIVE: {IMAGES_ONLY, SENTENCE_INPUT_ACTIVE},
+    SENTENCE_INPUT_ACTIVE: {WORD_INPUT_ACTIVE, COMPLETED},
+    COMPLETED: {WAITING, IMAGES_ONLY},
+}
+
+# 단계 저장 위치
+# - 클래스: classrooms/{id}/appState/current.currentPhase (문서가 없으면 만듦)
+# - 레슨: lessons/{id}.activityData.currentPhase (레슨 문서가 있어야 함)
+LESSON_PHASE_FIELD = 'activityData.currentPhase'
+# get_all로 읽는 필드 (레슨 문서 전체를 읽지 않음)
+READ_FIELDS = ['currentPhase', LESSON_PHASE_FIELD]
+
+
+def can_transition(current, phase):
+    return current == phase or phase in TRANSITIONS.get(current, ())
+
+
+def phase_ref(runtime, collection, scope_id):
+    if collection == 'classrooms':
+        return runtime.scope_doc(collection, scope_id, 'appState')
+    return runtime.scope_ref(collection, scope_id)
+
+
+def read_phase(collection, snapshot):
+    """
+    단계 문서 스냅샷에서 현재 단계를 읽습니다. 대상이 없으면 None입니다.
+    """
+    if not snapshot.exists:
+        return WAITING if collection == 'classrooms' else None
+    if collection == 'classrooms':
+        return (snapshot.to_dict() or {}).get('currentPhase') or WAITING
+    return ((snapshot.to_dict() or {}).get('activityData') or {}).get('currentPhase') or WAITING
+
+
+def phase_writes(ref, collection, phase):
+    if collection == 'classrooms':
+        return [set_write(ref, {'currentPhase': phase, 'updatedAt': gcf.SERVER_TIMESTAMP}, merge=True)]
+    return [update_write(ref, {LESSON_PHASE_FIELD: phase, 'activityData.updatedAt': gcf.SERVER_TIMESTAMP})]
+
+
+def _commit_each(db, groups):
+    # 대상마다 따로 커밋하고 대상별 예외(성공 시 None)를 반환합니다.
+    errors = {}
+    for target, writes in groups:
+        try:
+            commit_atomic(db, writes)
+            errors[target] = None
+        except Exception as e:
+            errors[target] = e
+    return errors
+
+
+def set_phases(runtime, targets, phase, force=False):
+    """
+    (collection, scope_id) 대상들의 단계를 phase로 바꾸고 대상별 결과 목록을 반환합니다.
+    - 현재 단계는 get_all 한 번으로 읽습니다.
+    - 바꿀 대상만 WriteBatch로 묶어 커밋합니다. 대상마다 쓰기 1개이고 대상 수는
+      MAX_BULK_TARGETS(200) 이하이므로 항상 500개 제한 안의 원자적 커밋 1번입니다.
+    - 원자적 커밋이라 쓰기 하나가 실패하면 (예: get_all 뒤에 지워진 레슨) 배치 전체가 거부됩니다.
+      그때는 대상마다 따로 다시 커밋해 실패한 대상만 not_found/failed로 남깁니다.
+    - force가 아니면 TRANSITIONS에 없는 이동은 'rejected'로 남기고 쓰지 않습니다.
+    결과 status: updated, unchanged, rejected, not_found, failed
+    """
+    if phase not in PHASES:
+        raise ValueError(f"Unknown phase: {phase}")
+    refs = {target: phase_ref(runtime, *target) for target in targets}
+    snapshots = {
+        snapshot.reference.path: snapshot
+        for snapshot in runtime.db.get_all(list(refs.values()), field_paths=READ_FIELDS)
+    }
+
+    results = {}
+    groups = []
+    for target, ref in refs.items():
+        collection, scope_id = target
+        snapshot = snapshots.get(ref.path)
+        current = read_phase(collection, snapshot) if snapshot is not None else None
+        result = {
+            'type': 'class' if collection == 'classrooms' else 'lesson',
+            'id': scope_id,
+            'previousPhase': current,
+        }
+        if current is None:
+            result['status'] = 'not_found'
+        elif current == phase:
+            result['status'] = 'unchanged'
+        elif not force and not can_transition(current, phase):
+            result['status'] = 'rejected'
+            result['error'] = f"Cannot move from {current} to {phase}"
+        else:
+            groups.append((target, phase_writes(ref, collection, phase)))
+        results[target] = result
+
+    errors = commit_chunked(runtime.db, groups)
+    if len(groups) > 1 and any(error is not None for error in errors.values()):
+        errors = _commit_each(runtime.db, groups)
+    for target, error in errors.items():
+        if error is None:
+            results[target]['status'] = 'updated'
+        elif isinstance(error, exceptions.NotFound):
+            results[target]['status'] = 'not_found'
+        else:
+            results[target]['status'] = 'failed'
+            results[target]['error'] = str(error)
+
+    for result in results.values():
+        result['success'] = result['status'] in ('updated', 'unchanged')
+    return list(results.values())
@@ -0,0 +1,313 @@
+# HTTPS 함수 공통 요청 처리 파이프라인
+
+import functools
+from collections import namedtuple
+
+from firebase_functions import https_fn
+
+import json_codec
+import timing
+from etags import etag_for, etag_matches
+from rate_limit import LOAD_SHEDDER
+from runtime import get_runtime
+from singleflight import SINGLE_FLIGHT
+
+JSON_HEADERS = {'Content-Type': 'application/json; charset=utf-8'}
+EVENT_STREAM_HEADERS = {
+    'Content-Type': 'text/event-stream; charset=utf-8',
+    'Cache-Control': 'no-cache',
+    'X-Accel-Buffering': 'no',
+}
+
+
+class RequestError(Exception):
+    """
+    클라이언트에게 {"error": message} 형태로 돌려줄 요청 오류입니다.
+    """
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Field:
+    """
+    요청 data 필드 하나의 검증 규칙입니다.
+    """
+
+    def __init__(self, kind=str, required=False, default=None, choices=None,
+                 min_value=None, max_value=None, item_kind=None, max_items=None):
+        self.kind = kind
+        self.required = required
+        self.default = default
+        self.choices = choices
+        self.min_value = min_value
+        self.max_value = max_value
+        self.item_kind = item_kind
+        self.max_items = max_items
+
+    def validate(self, name, value):
+        if self.kind is int and isinstance(value, bool) or not isinstance(value, self.kind):
+            raise RequestError(f"{name} must be of type {self.kind.__name__}")
+        if self.choices is not None and value not in self.choices:
+            raise RequestError(f"{name} must be one of: {', '.join(map(str, self.choices))}")
+        if self.min_value is not None and value < self.min_value:
+            raise RequestError(f"{name} must be at least {self.min_value}")
+        if self.max_value is not None and value > self.max_value:
+            raise RequestError(f"{name} must be at most {self.max_value}")
+        if self.kind is list:
+            if self.max_items is not None and len(value) > self.max_items:
+                raise RequestError(f"At most {self.max_items} {name} are allowed")
+            if self.item_kind is not None and not all(isinstance(item, self.item_kind) for item in value):
+                raise RequestError(f"{name} must contain only {self.item_kind.__name__} values")
+        return value
+
+
+def encode_error(message):
+    """
+    {"error": message} 응답 본문을 미리 인코딩합니다.
+    """
+    return json_codec.dumps({'error': message})
+
+
+# 자주 쓰는 오류 응답 본문 (모듈 로드 시 한 번만 인코딩)
+METHOD_NOT_ALLOWED = encode_error("Only POST requests are allowed")
+INVALID_REQUEST_FORMAT = encode_error("Invalid request format")
+INITIALIZATION_FAILED = encode_error("Firebase initialization failed")
+TOO_MANY_REQUESTS = json_codec.dumps({
+    'error': {'message': 'Too many requests for this class or lesson, please retry later', 'code': 'resource-exhausted'}
+})
+DEADLINE_EXCEEDED = json_codec.dumps({
+    'error': {'message': 'Firestore request timed out', 'code': 'deadline-exceeded'}
+})
+
+
+def json_response(payload, status=200, headers=None):
+    """
+    payload(dict 또는 미리 인코딩된 bytes)로 JSON 응답을 만듭니다.
+    """
+    body = payload if isinstance(payload, bytes) else json_codec.dumps(payload)
+    response_headers = dict(JSON_HEADERS)
+    if headers:
+        response_headers.update(headers)
+    return https_fn.Response(body, status=status, headers=response_headers)
+
+
+def data_response(data, status=200, headers=None):
+    """
+    {"data": data} 형태의 성공 응답을 만듭니다.
+    """
+    return json_response({'data': data}, status, headers)
+
+
+def tagged_data_response(data, hash_value):
+    """
+    ETag(내용 해시)가 붙은 {"data": data} 응답을 만듭니다.
+    요청의 If-None-Match가 같으면 endpoint가 304로 바꿔 보냅니다.
+    """
+    return data_response(data, headers={'ETag': etag_for(hash_value), 'Access-Control-Expose-Headers': 'ETag'})
+
+
+def not_modified_response(etag):
+    return https_fn.Response(status=304, headers={'ETag': etag, 'Access-Control-Expose-Headers': 'ETag'})
+
+
+def sse_event(event, data):
+    """
+    server-sent events 형식의 이벤트 하나를 인코딩합니다.
+    """
+    return b'event: ' + event.encode('utf-8') + b'\ndata: ' + json_codec.dumps(data) + b'\n\n'
+
+
+def wants_event_stream(req, params):
+    """
+    data.stream이 true이거나 Accept 헤더가 text/event-stream이면 스트리밍 응답을 원하는 요청입니다.
+    """
+    return bool(params.get('stream')) or 'text/event-stream' in req.headers.get('Accept', '')
+
+
+def event_stream_response(chunks):
+    """
+    bytes 청크를 만들어 내는 제너레이터로 스트리밍 응답을 만듭니다 (청크 단위 전송).
+    """
+    return https_fn.Response(chunks, status=200, headers=EVENT_STREAM_HEADERS)
+
+
+def internal_error_response(name, error):
+    print(f"Error in {name}: {str(error)}")
+    return json_response({
+        'error': {
+            'message': f'Internal server error: {str(error)}',
+            'code': 'internal'
+        }
+    }, 500)
+
+
+def parse_request_data(req):
+    """
+    {"data": {...}} 형태의 요청 본문에서 data를 꺼냅니다.
+    """
+    raw = req.get_data(cache=True)
+    if not raw:
+        raise RequestError("Invalid request format")
+    try:
+        request_data = json_codec.loads(raw)
+    except (json_codec.JSONDecodeError, ValueError):
+        raise RequestError("Invalid request format")
+    if not isinstance(request_data, dict) or not isinstance(request_data.get('data'), dict):
+        raise RequestError("Invalid request format")
+    return request_data['data']
+
+
+def validate_data(data, schema, required_errors):
+    params = {}
+    for name, field in schema.items():
+        value = data.get(name)
+        if value is None or value == '':
+            if field.required:
+                raise RequestError(required_errors[name])
+            params[name] = field.default
+            continue
+        params[name] = field.validate(name, value)
+    return params
+
+
+# 요청마다 CORS 래퍼와 타이머가 다시 붙이는 헤더 (공유 응답에서 복사하지 않음)
+PER_REQUEST_HEADERS = ('access-control-allow-', 'access-control-max-age', 'vary', 'server-timing')
+
+# 여러 요청이 공유하는 응답의 고정 사본 (본문, 상태, 핸들러가 붙인 헤더)
+FrozenResponse = namedtuple('FrozenResponse', ['body', 'status', 'headers'])
+
+
+def _is_per_request_header(name):
+    return name.lower().startswith(PER_REQUEST_HEADERS)
+
+
+def freeze_response(result):
+    """
+    핸들러 결과가 응답 객체이면 CORS 래퍼가 헤더를 붙이기 전에 고정 사본으로 바꿉니다.
+    dict 결과는 그대로 둡니다.
+    """
+    if not isinstance(result, https_fn.Response):
+        return result
+    headers = tuple((key, value) for key, value in result.headers.items() if not _is_per_request_header(key))
+    return FrozenResponse(result.get_data(), result.status_code, headers)
+
+
+def copy_response(result):
+    """
+    공유된 결과로 이 요청만의 응답 객체를 만듭니다 (헤더를 요청별로 붙일 수 있도록).
+    """
+    if isinstance(result, FrozenResponse):
+        return https_fn.Response(result.body, status=result.status, headers=list(result.headers))
+    if isinstance(result, https_fn.Response):
+        headers = [(key, value) for key, value in result.headers.items() if not _is_per_request_header(key)]
+        return https_fn.Response(result.get_data(), status=result.status_code, headers=headers)
+    return result
+
+
+def request_id_of(req, data):
+    """
+    클라이언트 요청 ID를 data.requestId 또는 X-Request-Id 헤더에서 찾습니다.
+    """
+    request_id = data.get('requestId') if isinstance(data, dict) else None
+    if not isinstance(request_id, str) or not request_id:
+        request_id = req.headers.get('X-Request-Id')
+    return request_id or None
+
+
+def endpoint(schema=None, methods=('POST',), needs_runtime=True, coalesce=False, rate_limit=None):
+    """
+    HTTPS 함수 공통 처리를 적용하는 데코레이터입니다.
+    - 메서드 확인 → Firebase 런타임 준비 → 본문 파싱 → 스키마 검증
+    - handler(req, runtime, params)가 dict를 반환하면 {"data": ...}로 응답하고,
+      https_fn.Response를 반환하면 그대로 응답합니다.
+    - 고정된 오류 응답(405/400/500/504)은 미리 인코딩된 본문을 사용합니다.
+    - 단계별 소요 시간을 timing 모듈에 기록합니다 (init, parse, serialize 등).
+    - coalesce=True이면 같은 입력으로 동시에 들어온 요청을 한 번만 실행하고
+      (single-flight), requestId가 같은 재요청에는 이전 결과를 돌려줍니다.
+      coalesce에 (req, params) -> bool 함수를 주면 요청마다 결정합니다
+      (스트리밍 응답은 한 번만 읽을 수 있으므로 공유하면 안 됩니다).
+      공유하는 응답은 CORS 헤더가 붙기 전의 고정 사본이라 재요청에도 헤더가 중복되지 않습니다.
+    - 응답에 ETag가 있고 요청 If-None-Match와 같으면 본문 없이 304로 응답합니다
+      (공유된 응답이어도 요청마다 따로 비교합니다).
+    - rate_limit=(컬렉션, 필드명)이면 해당 범위의 토큰 버킷을 확인하고
+      초과 시 미리 인코딩된 429 응답과 Retry-After 헤더를 돌려줍니다.
+    """
+    schema = schema or {}
+    methods = tuple(methods)
+    if methods == ('POST',):
+        method_error = METHOD_NOT_ALLOWED
+    else:
+        method_error = encode_error(f"Only {' or '.join(methods)} requests are allowed")
+    required_errors = {name: f"{name} is required" for name, field in schema.items() if field.required}
+    encoded_errors = {message: encode_error(message) for message in required_errors.values()}
+    encoded_errors["Invalid request format"] = INVALID_REQUEST_FORMAT
+
+    def decorator(handler):
+        name = handler.__name__
+
+        def dispatch(req):
+            if req.method not in methods:
+                return json_response(method_error, 405)
+
+            runtime = None
+            if needs_runtime:
+                try:
+                    with timing.stage('init'):
+                        runtime = get_runtime()
+                except Exception as e:
+                    print(f"Firebase initialization error: {e}")
+                    return json_response(INITIALIZATION_FAILED, 500)
+
+            try:
+                with timing.stage('parse'):
+                    data = parse_request_data(req) if schema else {}
+                    params = validate_data(data, schema, required_errors)
+                if rate_limit is not None:
+                    collection, field_name = rate_limit
+                    allowed, retry_after = LOAD_SHEDDER.check(name, f'{collection}/{params[field_name]}')
+                    if not allowed:
+                        return json_response(TOO_MANY_REQUESTS, 429, {'Retry-After': str(retry_after)})
+                if coalesce(req, params) if callable(coalesce) else coalesce:
+                    key = (name, repr(sorted(params.items())))
+                    with timing.stage('handler'):
+                        # 공유되는 것은 고정 사본뿐이고, 리더를 포함한 요청마다 새 응답 객체를 만듭니다.
+                        result, shared = SINGLE_FLIGHT.run(
+                            key, lambda: freeze_response(handler(req, runtime, params)), request_id_of(req, data)
+                        )
+                    if shared:
+                        print(f"Coalesced duplicate request in {name}")
+                    result = copy_response(result)
+                else:
+                    result = handler(req, runtime, params)
+                if isinstance(result, https_fn.Response):
+                    etag = result.headers.get('ETag')
+                    if etag and etag_matches(req.headers.get('If-None-Match'), etag):
+                        return not_modified_response(etag)
+                    return result
+                with timing.stage('serialize'):
+                    return data_response(result)
+            except RequestError as e:
+                return json_response(encoded_errors.get(e.message) or encode_error(e.message), e.status)
+            except TimeoutError:
+                print(f"Timeout in {name}")
+                return json_response(DEADLINE_EXCEEDED, 504)
+            except Exception as e:
+                return internal_error_response(name, e)
+
+        @functools.wraps(handler)
+        def wrapped(req):
+            timer, token = timing.start(name)
+            response = None
+            try:
+                response = dispatch(req)
+                return response
+            finally:
+                timer.finish(response, response.status_code if response is not None else 500)
+                timing.stop(token)
+
+        return wrapped
+
+    return decorator
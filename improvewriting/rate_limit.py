@@ -0,0 +1,178 @@
+# 클래스/레슨별 토큰 버킷 요청 제한 (부하 분산)
+
+import math
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from google.cloud import firestore as gcf
+
+from runtime import get_runtime
+
+# 범위(클래스/레슨)별 순간 최대 요청 수와 초당 보충 속도
+DEFAULT_CAPACITY = float(os.environ.get('RATE_LIMIT_CAPACITY', '60'))
+DEFAULT_REFILL_PER_SECOND = float(os.environ.get('RATE_LIMIT_REFILL_PER_SECOND', '2'))
+# 'memory'(인스턴스별) 또는 'firestore'(인스턴스 간 공유)
+RATE_LIMIT_MODE = os.environ.get('RATE_LIMIT_MODE', 'memory')
+# 메모리에 유지할 최대 버킷 수 (오래 쓰지 않은 버킷부터 제거)
+MAX_BUCKETS = 10000
+# 분산 모드 버킷 문서 컬렉션
+RATE_LIMIT_COLLECTION = 'rateLimits'
+
+
+class TokenBucket:
+    """
+    capacity개까지 쌓이고 초당 refill_per_second개씩 보충되는 토큰 버킷입니다.
+    """
+
+    __slots__ = ('tokens', 'updated_at')
+
+    def __init__(self, capacity, now):
+        self.tokens = capacity
+        self.updated_at = now
+
+
+def _refill(tokens, updated_at, now, capacity, refill_per_second):
+    return min(capacity, tokens + max(now - updated_at, 0.0) * refill_per_second)
+
+
+def _retry_after(tokens, refill_per_second):
+    if refill_per_second <= 0:
+        return 60
+    return max(1, math.ceil((1.0 - tokens) / refill_per_second))
+
+
+class MemoryRateLimiter:
+    """
+    인스턴스 메모리에 범위별 버킷을 보관합니다. 확인 비용이 O(1)이고 왕복이 없습니다.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, refill_per_second=DEFAULT_REFILL_PER_SECOND,
+                 clock=time.monotonic, max_buckets=MAX_BUCKETS):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        """
+        (허용 여부, Retry-After 초)를 반환합니다.
+        """
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.capacity, now)
+                while len(self._buckets) > self._max_buckets:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                bucket.tokens = _refill(bucket.tokens, bucket.updated_at, now,
+                                        self.capacity, self.refill_per_second)
+                bucket.updated_at = now
+
+            if bucket.tokens >= 1.0:
+                bucket.tokens -= 1.0
+                return True, 0
+            return False, _retry_after(bucket.tokens, self.refill_per_second)
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class FirestoreRateLimiter:
+    """
+    rateLimits/{scope} 문서에 버킷을 저장해 모든 인스턴스가 같은 한도를 공유합니다.
+    요청마다 트랜잭션 1회(읽기+쓰기)가 추가되므로 필요한 경우에만 사용합니다.
+    """
+
+    def __init__(self, db_provider, capacity=DEFAULT_CAPACITY, refill_per_second=DEFAULT_REFILL_PER_SECOND,
+                 clock=time.time):
+        self._db_provider = db_provider
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+
+    def take(self, key):
+        db = self._db_provider()
+        ref = db.collection(RATE_LIMIT_COLLECTION).document(key.replace('/', '_'))
+        capacity, rate, now = self.capacity, self.refill_per_second, self._clock()
+
+        @gcf.transactional
+        def _take(transaction):
+            snapshot = ref.get(transaction=transaction)
+            if snapshot.exists:
+                data = snapshot.to_dict()
+                tokens = _refill(data.get('tokens', capacity), data.get('updatedAt', now), now, capacity, rate)
+            else:
+                tokens = capacity
+            allowed = tokens >= 1.0
+            if allowed:
+                tokens -= 1.0
+            transaction.set(ref, {'tokens': tokens, 'updatedAt': now})
+            return allowed, 0 if allowed else _retry_after(tokens, rate)
+
+        return _take(db.transaction())
+
+
+class LoadShedder:
+    """
+    선택된 제한기로 요청을 허용/차단하고 엔드포인트별 차단 수를 셉니다.
+    버킷은 (엔드포인트, 범위)마다 따로 두어, 학생들의 AI 영감 요청이 교사의
+    startNewActivity/generateImages 한도를 소진하지 않게 합니다.
+    분산 모드에서 Firestore 확인이 실패하면 메모리 제한기로 대신 판단합니다.
+    """
+
+    def __init__(self, limiter, fallback=None):
+        self.limiter = limiter
+        self.fallback = fallback
+        self.allowed = Counter()
+        self.shed = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, endpoint, scope_key):
+        bucket_key = f'{endpoint}:{scope_key}'
+        try:
+            allowed, retry_after = self.limiter.take(bucket_key)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            print(f"Rate limiter error, using in-memory fallback: {e}")
+            allowed, retry_after = self.fallback.take(bucket_key)
+        with self._lock:
+            (self.allowed if allowed else self.shed)[endpoint] += 1
+        return allowed, retry_after
+
+    def reset(self):
+        """
+        메모리 버킷과 카운터를 비웁니다 (벤치마크에서 실행 사이에 사용).
+        """
+        for limiter in (self.limiter, self.fallback):
+            if isinstance(limiter, MemoryRateLimiter):
+                limiter.reset()
+        with self._lock:
+            self.allowed.clear()
+            self.shed.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'mode': RATE_LIMIT_MODE,
+                'allowed': dict(self.allowed),
+                'shed': dict(self.shed),
+            }
+
+
+def _build_shedder():
+    memory = MemoryRateLimiter()
+    if RATE_LIMIT_MODE == 'firestore':
+        return LoadShedder(FirestoreRateLimiter(lambda: get_runtime().db), fallback=memory)
+    return LoadShedder(memory)
+
+
+# 모듈 전역 제한기 - 웜 인스턴스의 모든 요청이 공유합니다.
+LOAD_SHEDDER = _build_shedder()
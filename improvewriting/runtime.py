@@ -0,0 +1,96 @@
+# 함수 인스턴스 전역 Firebase 런타임
+
+import threading
+import time
+
+# 범위(scope) 종류별 최상위 컬렉션 이름
+SCOPE_COLLECTIONS = {
+    'class': 'classrooms',
+    'lesson': 'lessons',
+}
+
+
+class FirebaseRuntime:
+    """
+    웜 인스턴스에서 재사용되는 Firebase 앱과 Firestore 클라이언트를 보관합니다.
+    - 클라이언트는 내부 gRPC 채널 풀을 가지므로 요청마다 새로 만들지 않습니다.
+    - 자주 쓰는 최상위 컬렉션 참조를 미리 만들어 둡니다.
+    """
+
+    def __init__(self, app, db, init_seconds=0.0):
+        self.app = app
+        self.db = db
+        self.init_seconds = init_seconds
+        self.created_at = time.time()
+        self.collections = {
+            name: db.collection(name) for name in SCOPE_COLLECTIONS.values()
+        }
+
+    def scope_ref(self, collection, scope_id):
+        """
+        classrooms/{id} 또는 lessons/{id} 문서 참조를 반환합니다.
+        """
+        return self.collections[collection].document(scope_id)
+
+    def scope_doc(self, collection, scope_id, subcollection, document='current'):
+        """
+        {collection}/{scope_id}/{subcollection}/{document} 문서 참조를 반환합니다.
+        """
+        return self.scope_ref(collection, scope_id).collection(subcollection).document(document)
+
+    def scope_collection(self, collection, scope_id, subcollection):
+        """
+        {collection}/{scope_id}/{subcollection} 컬렉션 참조를 반환합니다.
+        """
+        return self.scope_ref(collection, scope_id).collection(subcollection)
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime():
+    """
+    프로세스 전역 런타임을 반환합니다. 최초 호출 시에만 초기화합니다.
+    여러 요청 스레드가 동시에 들어와도 초기화는 한 번만 일어납니다.
+    """
+    global _runtime
+    runtime = _runtime
+    if runtime is not None:
+        return runtime
+
+    with _runtime_lock:
+        if _runtime is None:
+            # firebase_admin은 첫 요청(또는 워밍업)에서 가져옵니다 (모듈 로드 시간에서 제외).
+            import firebase_admin
+            from firebase_admin import firestore, initialize_app
+            started = time.perf_counter()
+            if not firebase_admin._apps:
+                app = initialize_app()
+            else:
+                app = firebase_admin.get_app()
+            db = firestore.client(app)
+            _runtime = FirebaseRuntime(app, db, time.perf_counter() - started)
+        return _runtime
+
+
+def is_warm():
+    """
+    런타임이 이미 초기화되었는지 여부를 반환합니다.
+    """
+    return _runtime is not None
+
+
+def warmup():
+    """
+    런타임을 미리 초기화하고 상태 정보를 반환합니다.
+    헬스 체크나 예약 워밍업 호출에서 사용합니다.
+    """
+    was_warm = is_warm()
+    runtime = get_runtime()
+    return {
+        'status': 'ok',
+        'wasWarm': was_warm,
+        'initSeconds': round(runtime.init_seconds, 4),
+        'uptimeSeconds': round(time.time() - runtime.created_at, 1),
+    }
@@ -0,0 +1,8 @@
+"""
+관리자용 일회성 스크립트 (배포 대상 아님).
+
+improvewriting 디렉터리에서 Firestore 관리자 자격 증명(GOOGLE_APPLICATION_CREDENTIALS)으로 실행합니다.
+
+    python -m scripts.migrate_ai_helpers --limit 100
+    python -m scripts.migrate_ai_helpers --apply
+"""
@@ -0,0 +1,35 @@
+# 이전 aiHelper 문서(JSON 문자열)를 버전 2(네이티브 맵)로 바꾸는 관리자 스크립트
+#
+#   python -m scripts.migrate_ai_helpers --limit 100          # 바뀔 문서 수만 세기
+#   python -m scripts.migrate_ai_helpers --limit 100 --apply  # 100개만 바꾸기
+#   python -m scripts.migrate_ai_helpers --apply              # 전체 바꾸기
+#
+# 기본은 쓰지 않고 세기만 합니다 (--apply를 줘야 씀). 여러 번 실행해도 안전합니다.
+
+import argparse
+import json
+import sys
+
+from ai_helper_store import migrate_legacy_ai_helpers
+from runtime import get_runtime
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Migrate legacy aiHelper documents to schema version 2')
+    parser.add_argument('--limit', type=int, default=None, help='최대로 살펴볼 aiHelper 문서 수')
+    parser.add_argument('--apply', action='store_true', help='실제로 씁니다 (없으면 세기만 함)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.limit is not None and args.limit < 1:
+        print('--limit must be at least 1', file=sys.stderr)
+        return 2
+    counts = migrate_legacy_ai_helpers(get_runtime().db, limit=args.limit, dry_run=not args.apply)
+    print(json.dumps({'applied': args.apply, 'counts': counts}, ensure_ascii=False, indent=2))
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+# 예시 문장 템플릿 (모듈 로드 시 한 번만 컴파일)
+
+import random
+
+# 낱말도 이미지 요소도 없을 때 쓰는 문장
+DEFAULT_SENTENCE = "이미지를 보며 떠오르는 감정과 생각을 자유롭게 표현해보세요."
+
+# 템플릿 그룹 - 사용할 수 있는 입력(이미지 요소/낱말)에 따라 한 그룹을 고릅니다.
+# 자리표시자: {element} 첫 이미지 요소, {word} 첫 낱말, {words} 앞의 두 낱말, {keyword} 키워드 하나
+TEMPLATE_GROUPS = {
+    'image_words': (
+        "{element}에서 {word}을(를) 발견한 순간, {keyword} 마음이 들었습니다.",
+        "{keyword} {element}에서 {words}이(가) 춤추고 있는 것 같아요.",
+        "만약 내가 이 {element}에 있다면, {word}과 함께 {keyword} 시간을 보내고 싶어요.",
+    ),
+    'image': (
+        "이 {element}를 보면 {keyword} 느낌이 듭니다.",
+        "{keyword} {element}에서 어떤 이야기가 펼쳐질까요?",
+        "{element} 속에서 {keyword} 모험을 상상해보세요.",
+    ),
+    'words': (
+        "이 {words}를 보니 {keyword} 느낌이 듭니다.",
+        "{word}에서 {keyword} 이야기가 시작될 것 같습니다.",
+    ),
+}
+
+# 템플릿마다 {keyword} 앞/뒤 조각을 미리 나눠 둡니다 (요청마다 format 파싱을 하지 않도록).
+COMPILED_GROUPS = {
+    group: tuple(tuple(template.split('{keyword}', 1)) for template in templates)
+    for group, templates in TEMPLATE_GROUPS.items()
+}
+
+
+def _group_for(image_elements, words):
+    if image_elements and words:
+        return 'image_words'
+    if image_elements:
+        return 'image'
+    if words:
+        return 'words'
+    return None
+
+
+def generate_sentences(words, keywords, image_elements, count=1, rng=random):
+    """
+    서로 다른 예시 문장을 최대 count개 반환합니다.
+    (템플릿, 키워드) 조합에서 중복 없이 뽑으므로 재시도가 없고,
+    가능한 조합보다 많이 요청하면 가능한 만큼만 돌려줍니다.
+    """
+    group = _group_for(image_elements, words)
+    if group is None or not keywords:
+        return [DEFAULT_SENTENCE]
+
+    values = {
+        'element': image_elements[0] if image_elements else '',
+        'word': words[0] if words else '이미지',
+        'words': ', '.join(words[:2]),
+    }
+    templates = [
+        (head.format(**values), tail.format(**values))
+        for head, tail in COMPILED_GROUPS[group]
+    ]
+    unique_keywords = list(dict.fromkeys(keywords))
+
+    combinations = len(templates) * len(unique_keywords)
+    picks = rng.sample(range(combinations), min(count, combinations))
+
+    sentences = []
+    seen = set()
+    for pick in picks:
+        head, tail = templates[pick % len(templates)]
+        sentence = f'{head}{unique_keywords[pick // len(templates)]}{tail}'
+        if sentence not in seen:
+            seen.add(sentence)
+            sentences.append(sentence)
+    return sentences
@@ -0,0 +1,167 @@
+# sharedImages/current 읽기 캐시 (인스턴스 메모리, 범위별 이미지 설명)
+
+import contextlib
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+from async_runtime import with_timeout
+from inspiration_cache import TTLCache
+
+# 다른 인스턴스가 바꾼 이미지를 늦게 볼 수 있는 최대 시간 (초)
+DEFAULT_TTL_SECONDS = float(os.environ.get('SHARED_IMAGES_CACHE_TTL', '30'))
+DEFAULT_MAX_ENTRIES = int(os.environ.get('SHARED_IMAGES_CACHE_SIZE', '1024'))
+# 이미지 설명에 필요한 필드만 읽습니다.
+READ_FIELDS = ['alt1', 'alt2', 'updatedAt']
+
+
+def image_descriptions_from(images_doc):
+    """
+    sharedImages/current 문서 스냅샷에서 이미지 설명 2개를 꺼냅니다.
+    """
+    if not images_doc.exists:
+        return []
+    image_data = images_doc.to_dict()
+    return [
+        image_data.get('alt1', ''),
+        image_data.get('alt2', '')
+    ]
+
+
+def _version(snapshot):
+    # 문서의 updatedAt (서버 타임스탬프)을 버전으로 씁니다.
+    return (snapshot.to_dict() or {}).get('updatedAt') if snapshot.exists else None
+
+
+def _is_older(version, cached_version):
+    if version is None or cached_version is None:
+        return False
+    try:
+        return version < cached_version
+    except TypeError:
+        return False
+
+
+class SharedImagesCache:
+    """
+    범위('lessons/{id}' 등)별 현재 이미지 설명을 보관하는 read-through 캐시입니다.
+    - 같은 인스턴스의 쓰기 경로가 저장 직후 새 값을 넣고, 쓰기 도중에는 항목을 지웁니다.
+    - 캐시를 놓친 읽기는 시작 시점의 세대(generation)를 기억했다가, 그 사이 쓰기가 있었으면 채우지 않습니다.
+    - 읽은 문서의 updatedAt을 버전으로 저장해 더 오래된 읽기 결과가 새 값을 덮지 않게 합니다.
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self._cache = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._counter = itertools.count(1)
+        self._changed = OrderedDict()
+        self._max_tracked = max_entries * 4
+        self._floor = 0
+        self.fills = 0
+        self.stale_fills = 0
+
+    def get(self, scope):
+        """
+        캐시된 이미지 설명 목록을 반환합니다. 없거나 만료되었으면 None입니다.
+        """
+        entry = self._cache.get(scope)
+        return entry[1] if entry is not None else None
+
+    def begin_read(self, scope):
+        """
+        캐시를 놓친 읽기를 시작하기 전에 호출해 세대 토큰을 받습니다.
+        """
+        with self._lock:
+            return next(self._counter)
+
+    def fill(self, scope, descriptions, version, token):
+        """
+        Firestore에서 읽은 값을 넣습니다. 읽는 동안 쓰기가 있었거나 더 새 버전이 있으면 버립니다.
+        """
+        with self._lock:
+            if max(self._changed.get(scope, 0), self._floor) > token:
+                self.stale_fills += 1
+                return False
+            current = self._cache.peek(scope)
+            if current is not None and _is_older(version, current[0]):
+                self.stale_fills += 1
+                return False
+            self._cache.put(scope, (version, descriptions))
+            self.fills += 1
+            return True
+
+    def _mark_changed(self, scope):
+        self._changed[scope] = next(self._counter)
+        self._changed.move_to_end(scope)
+        while len(self._changed) > self._max_tracked:
+            _, changed_at = self._changed.popitem(last=False)
+            self._floor = max(self._floor, changed_at)
+
+    def store(self, scope, descriptions, version=None):
+        """
+        쓰기 경로가 저장을 마친 새 값을 넣습니다.
+        """
+        with self._lock:
+            self._mark_changed(scope)
+            self._cache.put(scope, (version, descriptions))
+
+    def invalidate(self, scope):
+        with self._lock:
+            self._mark_changed(scope)
+            self._cache.discard(scope)
+
+    @contextlib.contextmanager
+    def updating(self, scope, descriptions):
+        """
+        sharedImages 쓰기 구간을 감쌉니다. 성공하면 새 값을 넣고, 실패하면 항목을 지운 채로 둡니다.
+        """
+        self.invalidate(scope)
+        yield
+        self.store(scope, descriptions)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._changed.clear()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats['fills'] = self.fills
+        stats['staleFills'] = self.stale_fills
+        return stats
+
+
+def read_image_descriptions(runtime, collection, scope_id):
+    """
+    범위의 현재 이미지 설명을 캐시에서, 없으면 Firestore에서 읽습니다.
+    """
+    scope = f'{collection}/{scope_id}'
+    descriptions = SHARED_IMAGES_CACHE.get(scope)
+    if descriptions is not None:
+        return descriptions
+    token = SHARED_IMAGES_CACHE.begin_read(scope)
+    snapshot = runtime.scope_doc(collection, scope_id, 'sharedImages').get(field_paths=READ_FIELDS)
+    descriptions = image_descriptions_from(snapshot)
+    SHARED_IMAGES_CACHE.fill(scope, descriptions, _version(snapshot), token)
+    return descriptions
+
+
+async def read_image_descriptions_async(async_runtime, collection, scope_id, timeout):
+    """
+    read_image_descriptions의 AsyncClient 버전입니다 (호출마다 제한 시간 적용).
+    """
+    scope = f'{collection}/{scope_id}'
+    descriptions = SHARED_IMAGES_CACHE.get(scope)
+    if descriptions is not None:
+        return descriptions
+    token = SHARED_IMAGES_CACHE.begin_read(scope)
+    shared_images_ref = async_runtime.scope_doc(collection, scope_id, 'sharedImages')
+    snapshot = await with_timeout(shared_images_ref.get(field_paths=READ_FIELDS), timeout)
+    descriptions = image_descriptions_from(snapshot)
+    SHARED_IMAGES_CACHE.fill(scope, descriptions, _version(snapshot), token)
+    return descriptions
+
+
+# 모듈 전역 캐시 - 웜 인스턴스의 모든 요청이 공유합니다.
+SHARED_IMAGES_CACHE = SharedImagesCache()
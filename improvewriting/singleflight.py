@@ -0,0 +1,95 @@
+# 인스턴스 내 중복 요청 합치기 (single-flight) + 클라이언트 요청 ID 멱등성 창
+
+import os
+import threading
+
+from inspiration_cache import TTLCache
+
+# 같은 requestId로 다시 온 요청에 이전 결과를 돌려주는 시간 (초)
+IDEMPOTENCY_WINDOW_SECONDS = float(os.environ.get('IDEMPOTENCY_WINDOW_SECONDS', '30'))
+# 리더 실행을 기다리는 최대 시간 (초)
+DEFAULT_WAIT_TIMEOUT = 30.0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 한 번만 실행하고 결과를 모든 대기자에게 나눠줍니다.
+    - 먼저 도착한 호출(리더)만 fn을 실행합니다.
+    - 실행 중에 도착한 호출은 리더의 결과(또는 예외)를 그대로 받습니다.
+    - requestId가 있으면 완료된 결과를 IDEMPOTENCY_WINDOW_SECONDS 동안 보관해
+      같은 키(함수 + 입력)와 같은 requestId의 재시도/더블클릭에 같은 결과를 돌려줍니다.
+    """
+
+    def __init__(self, idempotency_window=IDEMPOTENCY_WINDOW_SECONDS, wait_timeout=DEFAULT_WAIT_TIMEOUT):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._completed = TTLCache(max_entries=2048, ttl_seconds=idempotency_window)
+        self.wait_timeout = wait_timeout
+        self.executions = 0
+        self.coalesced = 0
+        self.replayed = 0
+
+    def run(self, key, fn, request_id=None):
+        """
+        (결과, 공유 여부)를 반환합니다. 공유 여부는 다른 호출의 결과를 받았을 때 True입니다.
+        """
+        if request_id:
+            # 함수와 입력이 같을 때만 재사용합니다 (다른 범위가 같은 requestId를 써도 섞이지 않음).
+            key = (*key, 'requestId', request_id)
+            cached = self._completed.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.replayed += 1
+                return cached, True
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            if not call.done.wait(self.wait_timeout):
+                raise TimeoutError(f"Timed out waiting for in-flight request {key[0]}")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            if request_id:
+                self._completed.put(key, call.result)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'replayed': self.replayed,
+                'inFlight': len(self._calls),
+            }
+
+
+# 모듈 전역 인스턴스 - 웜 인스턴스의 모든 요청 스레드가 공유합니다.
+SINGLE_FLIGHT = SingleFlight()
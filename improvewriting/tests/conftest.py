@@ -0,0 +1,43 @@
+# 단위 테스트 공통 설정
+#
+#   cd improvewriting && python -m pytest tests
+#
+# 함수 모듈(main, pipeline, ...)은 improvewriting/를 기준으로 가져오므로 경로에 넣습니다.
+
+import os
+import sys
+
+import pytest
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SOURCE_DIR not in sys.path:
+    sys.path.insert(0, SOURCE_DIR)
+
+# 요청마다 남기는 구조화 로그는 테스트 출력에서 끕니다 (timing 모듈 로드 전에 설정).
+os.environ.setdefault('TIMING_LOGS', '0')
+
+
+class FakeClock:
+    """
+    테스트에서 직접 앞으로 돌리는 시계입니다.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def fake_db():
+    from benchmarks.harness import install_fake_runtime
+    return install_fake_runtime()
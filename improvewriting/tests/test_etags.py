@@ -0,0 +1,29 @@
+from etags import content_hash, etag_for, etag_matches
+
+ETAG = etag_for('abc123')
+
+
+def test_strong_and_weak_validators_match():
+    assert etag_matches('"abc123"', ETAG)
+    assert etag_matches('W/"abc123"', ETAG)
+
+
+def test_any_entry_in_list_matches():
+    assert etag_matches('"other", W/"abc123"', ETAG)
+    assert etag_matches('"other",W/"abc123"', ETAG)
+    assert not etag_matches('"other", "another"', ETAG)
+
+
+def test_wildcard_matches_and_empty_header_does_not():
+    assert etag_matches('*', ETAG)
+    assert not etag_matches(None, ETAG)
+    assert not etag_matches('', ETAG)
+
+
+def test_unquoted_value_does_not_match():
+    assert not etag_matches('abc123', ETAG)
+
+
+def test_content_hash_is_independent_of_key_order():
+    assert content_hash({'a': 1, 'b': [1, 2]}) == content_hash({'b': [1, 2], 'a': 1})
+    assert content_hash({'a': 1}) != content_hash({'a': 2})
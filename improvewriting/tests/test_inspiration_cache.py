@@ -0,0 +1,60 @@
+from inspiration_cache import TTLCache, content_fingerprint, seed_for
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = TTLCache(max_entries=4, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    clock.advance(9.9)
+    assert cache.get('a') == 1
+    clock.advance(0.1)
+    assert cache.get('a') is None
+    assert cache.stats()['size'] == 0
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_put_refreshes_expiry_and_recency(clock):
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    clock.advance(8)
+    cache.put('a', 10)
+    cache.put('c', 3)
+    clock.advance(8)
+    assert cache.get('a') == 10
+    assert cache.get('b') is None
+
+
+def test_peek_does_not_count_or_reorder(clock):
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.peek('a') == 1
+    cache.put('c', 3)
+    assert cache.peek('a') is None
+    assert cache.stats()['hits'] == 0 and cache.stats()['misses'] == 0
+
+
+def test_stats_report_hit_rate(clock):
+    cache = TTLCache(max_entries=2, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    cache.get('a')
+    cache.get('missing')
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 1, 'hitRate': 0.5}
+
+
+def test_fingerprint_ignores_word_order_and_blank_words():
+    first = content_fingerprint('lessons/l1', ['바다', '산', ''], ['alt'])
+    assert first == content_fingerprint('lessons/l1', ['산', '바다'], ['alt'])
+    assert first != content_fingerprint('lessons/l2', ['산', '바다'], ['alt'])
+    assert seed_for(first) == int(first[:16], 16)
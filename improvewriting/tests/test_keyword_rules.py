@@ -0,0 +1,40 @@
+import random
+
+from keyword_rules import DEFAULT_RULES, ConceptMatcher
+
+
+def _rule(concept, *patterns):
+    return {'concept': concept, 'patterns': patterns, 'keywords': (), 'element': None}
+
+
+def _naive(rules, text):
+    text = text.lower()
+    return tuple(rule for rule in rules if any(pattern.lower() in text for pattern in rule['patterns']))
+
+
+def test_overlapping_and_nested_patterns_are_all_found():
+    rules = (_rule('he', 'he'), _rule('she', 'she'), _rule('his', 'his'), _rule('hers', 'hers'))
+    matcher = ConceptMatcher(rules)
+    assert [rule['concept'] for rule in matcher.match('ushers')] == ['he', 'she', 'hers']
+    assert [rule['concept'] for rule in matcher.match('ahishers')] == ['he', 'she', 'his', 'hers']
+
+
+def test_matches_follow_table_order_and_ignore_case():
+    matcher = ConceptMatcher(DEFAULT_RULES)
+    concepts = [rule['concept'] for rule in matcher.match('Sunlight over the LAKE near a Mountain 숲')]
+    assert concepts == ['mountain', 'forest', 'water', 'light']
+
+
+def test_no_match_returns_empty_tuple():
+    assert ConceptMatcher(DEFAULT_RULES).match('abstract shapes') == ()
+    assert ConceptMatcher(DEFAULT_RULES).match('') == ()
+
+
+def test_agrees_with_substring_search_on_random_text():
+    rng = random.Random(7)
+    rules = tuple(_rule(str(i), *{''.join(rng.choice('abc') for _ in range(rng.randint(1, 4)))
+                                  for _ in range(2)}) for i in range(12))
+    matcher = ConceptMatcher(rules)
+    for _ in range(300):
+        text = ''.join(rng.choice('abcA') for _ in range(rng.randint(0, 12)))
+        assert matcher.match(text) == _naive(rules, text)
@@ -0,0 +1,69 @@
+import uuid
+
+import pytest
+from firebase_functions import https_fn
+
+from pipeline import Field, RequestError, copy_response, freeze_response, validate_data
+
+SCHEMA = {
+    'classId': Field(str, required=True),
+    'count': Field(int, default=3, min_value=1, max_value=5),
+    'phase': Field(str, choices=('a', 'b')),
+    'ids': Field(list, default=[], item_kind=str, max_items=2),
+}
+REQUIRED_ERRORS = {'classId': 'classId is required'}
+
+
+def _error(data):
+    with pytest.raises(RequestError) as info:
+        validate_data(data, SCHEMA, REQUIRED_ERRORS)
+    return info.value.message
+
+
+def test_defaults_fill_missing_and_empty_values():
+    assert validate_data({'classId': 'c1', 'phase': ''}, SCHEMA, REQUIRED_ERRORS) == {
+        'classId': 'c1', 'count': 3, 'phase': None, 'ids': [],
+    }
+
+
+def test_required_field_uses_precomputed_message():
+    assert _error({}) == 'classId is required'
+    assert _error({'classId': ''}) == 'classId is required'
+
+
+def test_type_range_choice_and_list_rules():
+    assert _error({'classId': 1}) == 'classId must be of type str'
+    assert _error({'classId': 'c', 'count': True}) == 'count must be of type int'
+    assert _error({'classId': 'c', 'count': 9}) == 'count must be at most 5'
+    assert _error({'classId': 'c', 'count': 0}) == 'count must be at least 1'
+    assert _error({'classId': 'c', 'phase': 'z'}) == 'phase must be one of: a, b'
+    assert _error({'classId': 'c', 'ids': ['x', 'y', 'z']}) == 'At most 2 ids are allowed'
+    assert _error({'classId': 'c', 'ids': ['x', 2]}) == 'ids must contain only str values'
+
+
+def test_frozen_response_drops_per_request_headers():
+    response = https_fn.Response(b'{}', status=201, headers={'ETag': '"e"', 'Content-Type': 'application/json'})
+    response.headers.add('Access-Control-Allow-Origin', 'https://example.com')
+    response.headers.add('Vary', 'Origin')
+    copy = copy_response(freeze_response(response))
+    assert copy is not response
+    assert copy.status_code == 201 and copy.get_data() == b'{}'
+    assert copy.headers.get('ETag') == '"e"'
+    assert 'Access-Control-Allow-Origin' not in copy.headers and 'Vary' not in copy.headers
+
+
+def test_replayed_request_has_single_cors_headers(fake_db):
+    import main
+    from benchmarks.harness import invoke
+
+    origin = 'https://improvewritingapp.web.app'
+    headers = {'Origin': origin, 'X-Request-Id': uuid.uuid4().hex}
+    first = invoke(main.startNewActivity, {'classId': 'c1'}, headers=headers)
+    replay = invoke(main.startNewActivity, {'classId': 'c1'}, headers=headers)
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.get_data() == first.get_data()
+    for response in (first, replay):
+        assert response.headers.getlist('Access-Control-Allow-Origin') == [origin]
+        assert response.headers.getlist('Vary') == ['Origin']
+        assert response.headers.getlist('ETag') == first.headers.getlist('ETag')
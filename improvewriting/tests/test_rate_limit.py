@@ -0,0 +1,66 @@
+from rate_limit import FirestoreRateLimiter, LoadShedder, MemoryRateLimiter
+
+
+def test_bucket_allows_capacity_then_sheds_with_retry_after(clock):
+    limiter = MemoryRateLimiter(capacity=3, refill_per_second=0.5, clock=clock)
+    assert [limiter.take('a')[0] for _ in range(3)] == [True, True, True]
+    assert limiter.take('a') == (False, 2)
+
+
+def test_bucket_refills_over_time_up_to_capacity(clock):
+    limiter = MemoryRateLimiter(capacity=2, refill_per_second=1, clock=clock)
+    limiter.take('a')
+    limiter.take('a')
+    assert limiter.take('a')[0] is False
+    clock.advance(1)
+    assert limiter.take('a')[0] is True
+    assert limiter.take('a')[0] is False
+    # 오래 쉬어도 capacity 이상 쌓이지 않습니다.
+    clock.advance(100)
+    assert [limiter.take('a')[0] for _ in range(3)] == [True, True, False]
+
+
+def test_buckets_are_independent_and_least_recent_is_evicted(clock):
+    limiter = MemoryRateLimiter(capacity=1, refill_per_second=0, clock=clock, max_buckets=2)
+    assert limiter.take('a')[0] is True
+    assert limiter.take('b')[0] is True
+    assert limiter.take('a')[0] is False
+    # 'c'가 들어오면 가장 오래 쓰지 않은 'b'가 빠지고, 다시 오면 새 버킷으로 시작합니다.
+    assert limiter.take('c')[0] is True
+    assert limiter.take('b')[0] is True
+    assert limiter.take('c') == (False, 60)
+
+
+def test_shedder_keys_buckets_by_endpoint_and_scope(clock):
+    shedder = LoadShedder(MemoryRateLimiter(capacity=1, refill_per_second=0, clock=clock))
+    assert shedder.check('getAiInspiration', 'classrooms/c1')[0] is True
+    assert shedder.check('getAiInspiration', 'classrooms/c1')[0] is False
+    assert shedder.check('startNewActivity', 'classrooms/c1')[0] is True
+    assert shedder.check('getAiInspiration', 'classrooms/c2')[0] is True
+    stats = shedder.stats()
+    assert stats['allowed'] == {'getAiInspiration': 2, 'startNewActivity': 1}
+    assert stats['shed'] == {'getAiInspiration': 1}
+
+    shedder.reset()
+    assert shedder.check('getAiInspiration', 'classrooms/c1')[0] is True
+    assert shedder.stats()['shed'] == {}
+
+
+def test_shedder_falls_back_to_memory_when_limiter_fails(clock):
+    class Broken:
+        def take(self, key):
+            raise RuntimeError('firestore unavailable')
+
+    shedder = LoadShedder(Broken(), fallback=MemoryRateLimiter(capacity=1, refill_per_second=0, clock=clock))
+    assert shedder.check('e', 's')[0] is True
+    assert shedder.check('e', 's')[0] is False
+
+
+def test_firestore_limiter_shares_bucket_document(fake_db, clock):
+    limiter = FirestoreRateLimiter(lambda: fake_db, capacity=2, refill_per_second=1, clock=clock)
+    assert limiter.take('e:classrooms/c1')[0] is True
+    assert limiter.take('e:classrooms/c1')[0] is True
+    assert limiter.take('e:classrooms/c1') == (False, 1)
+    clock.advance(1)
+    assert limiter.take('e:classrooms/c1')[0] is True
+    assert fake_db._read('rateLimits/e:classrooms_c1')['tokens'] == 0
@@ -0,0 +1,103 @@
+import threading
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_run_once_and_share_result():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'result'
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.run(('f', 'a'), slow)))
+    leader.start()
+    assert started.wait(5)
+    waiters = [threading.Thread(target=lambda: results.append(flight.run(('f', 'a'), slow))) for _ in range(3)]
+    for waiter in waiters:
+        waiter.start()
+    # 대기자가 모두 합류한 뒤에 리더를 풀어줍니다.
+    while flight.stats()['coalesced'] < 3:
+        threading.Event().wait(0.001)
+    release.set()
+    for thread in [leader, *waiters]:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [('result', False)] + [('result', True)] * 3
+    assert flight.stats() == {'executions': 1, 'coalesced': 3, 'replayed': 0, 'inFlight': 0}
+
+
+def test_waiters_receive_leader_error():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            flight.run(('f',), failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    while flight.stats()['coalesced'] < 1:
+        threading.Event().wait(0.001)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+    assert errors == ['boom', 'boom']
+
+
+def test_sequential_calls_without_request_id_run_again():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.run(('f',), lambda: next(counter)) == (0, False)
+    assert flight.run(('f',), lambda: next(counter)) == (1, False)
+
+
+def test_request_id_replays_completed_result_for_same_key_only():
+    flight = SingleFlight()
+    counter = iter(range(10))
+    assert flight.run(('f', 'class-a'), lambda: next(counter), 'req-1') == (0, False)
+    assert flight.run(('f', 'class-a'), lambda: next(counter), 'req-1') == (0, True)
+    # 같은 requestId라도 함수나 입력이 다르면 새로 실행합니다.
+    assert flight.run(('f', 'class-b'), lambda: next(counter), 'req-1') == (1, False)
+    assert flight.run(('g', 'class-a'), lambda: next(counter), 'req-1') == (2, False)
+    assert flight.stats()['replayed'] == 1
+
+
+def test_failed_call_is_not_replayed():
+    flight = SingleFlight()
+
+    def failing():
+        raise RuntimeError('once')
+
+    with pytest.raises(RuntimeError):
+        flight.run(('f',), failing, 'req-1')
+    assert flight.run(('f',), lambda: 'ok', 'req-1') == ('ok', False)
+
+
+def test_replay_window_expires():
+    flight = SingleFlight(idempotency_window=0)
+    counter = iter(range(10))
+    assert flight.run(('f',), lambda: next(counter), 'req-1') == (0, False)
+    assert flight.run(('f',), lambda: next(counter), 'req-1') == (1, False)
@@ -0,0 +1,177 @@
+# 요청 단계별 지연 시간 측정 (인스턴스 내 히스토그램 + 구조화 로그 + Server-Timing)
+
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+import json_codec
+
+# 응답에 Server-Timing 헤더를 붙일지 여부 (SERVER_TIMING=1)
+SERVER_TIMING_ENABLED = os.environ.get('SERVER_TIMING', '0') == '1'
+# 요청마다 구조화 로그 한 줄을 남길지 여부 (TIMING_LOGS=0으로 끔)
+TIMING_LOGS_ENABLED = os.environ.get('TIMING_LOGS', '1') == '1'
+
+# 히스토그램 버킷 상한 (밀리초)
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current_timer = contextvars.ContextVar('request_timer', default=None)
+
+
+class Histogram:
+    """
+    고정 버킷 지연 시간 히스토그램입니다 (밀리초 단위).
+    """
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, value_ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, fraction):
+        """
+        해당 백분위수가 속한 버킷의 상한을 반환합니다 (마지막 버킷은 관측 최댓값).
+        """
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= target:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return float(min(BUCKET_BOUNDS_MS[index], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'meanMs': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'p50Ms': round(self.percentile(0.50), 3),
+            'p95Ms': round(self.percentile(0.95), 3),
+            'p99Ms': round(self.percentile(0.99), 3),
+            'maxMs': round(self.max_ms, 3),
+        }
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def record(endpoint, stage_name, duration_ms):
+    key = (endpoint, stage_name)
+    with _histograms_lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.record(duration_ms)
+
+
+def snapshot():
+    """
+    {endpoint: {stage: 요약}} 형태로 현재 히스토그램을 반환합니다.
+    """
+    with _histograms_lock:
+        result = {}
+        for (endpoint, stage_name), histogram in sorted(_histograms.items()):
+            result.setdefault(endpoint, {})[stage_name] = histogram.summary()
+        return result
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+class RequestTimer:
+    """
+    한 요청의 단계별 소요 시간을 모읍니다.
+    같은 이름의 단계가 여러 번 실행되면 시간을 합산합니다.
+    """
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    def add(self, stage_name, duration_ms):
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + duration_ms
+
+    @contextlib.contextmanager
+    def stage(self, stage_name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage_name, (time.perf_counter() - started) * 1000)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing_header(self, total_ms):
+        parts = [f'{name};dur={duration:.1f}' for name, duration in self.stages.items()]
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+    def finish(self, response, status):
+        """
+        히스토그램에 기록하고, 구조화 로그를 남기고, 필요하면 Server-Timing 헤더를 붙입니다.
+        """
+        total_ms = self.total_ms()
+        for name, duration in self.stages.items():
+            record(self.endpoint, name, duration)
+        record(self.endpoint, 'total', total_ms)
+
+        if TIMING_LOGS_ENABLED:
+            print(json_codec.dumps_str({
+                'severity': 'INFO',
+                'message': 'request_timing',
+                'endpoint': self.endpoint,
+                'status': status,
+                'totalMs': round(total_ms, 2),
+                'stagesMs': {name: round(duration, 2) for name, duration in self.stages.items()},
+            }))
+
+        if SERVER_TIMING_ENABLED and response is not None:
+            response.headers['Server-Timing'] = self.server_timing_header(total_ms)
+        return response
+
+
+def start(endpoint):
+    """
+    현재 컨텍스트의 요청 타이머를 시작합니다.
+    """
+    timer = RequestTimer(endpoint)
+    return timer, _current_timer.set(timer)
+
+
+def stop(token):
+    _current_timer.reset(token)
+
+
+def current():
+    return _current_timer.get()
+
+
+@contextlib.contextmanager
+def stage(stage_name):
+    """
+    현재 요청 타이머에 단계 시간을 기록합니다. 타이머가 없으면 아무것도 하지 않습니다.
+    """
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(stage_name):
+        yield
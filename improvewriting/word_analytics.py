@@ -0,0 +1,100 @@
+# 클래스/레슨 낱말 분석 (페이지 단위 스트리밍 + 요약 문서 1개)
+
+from collections import Counter
+from itertools import combinations
+
+from google.cloud import firestore as gcf
+
+from word_archive import word_entry_pages
+
+# 분석 요약 문서: {collection}/{scopeId}/wordAnalytics/current
+ANALYTICS_SUBCOLLECTION = 'wordAnalytics'
+# 한 번에 읽는 낱말 문서 수 (보관 문서는 한 문서가 한 페이지)
+PAGE_SIZE = 500
+# 요약 문서에 남길 상위 항목 수 (문서 크기를 작게 유지)
+TOP_WORDS = 50
+TOP_PAIRS = 20
+# 학생 한 명당 동시 출현 쌍 계산에 쓰는 최대 서로 다른 낱말 수 (쌍 수 상한 = n(n-1)/2)
+MAX_WORDS_PER_STUDENT = 30
+# 분석에 필요한 필드만 읽습니다.
+ANALYTICS_FIELDS = ['text', 'authorId', 'authorName', 'createdAt']
+
+
+def normalize_word(text):
+    return ' '.join(str(text or '').split()).lower()
+
+
+class WordAnalytics:
+    """
+    낱말 페이지를 차례로 받아 빈도, 학생별 참여, 동시 출현 쌍을 한 번의 순회로 집계합니다.
+    """
+
+    def __init__(self):
+        self.total_words = 0
+        self.pages = 0
+        self.word_counts = Counter()
+        self.display_text = {}
+        self.author_counts = Counter()
+        self.author_names = {}
+        self.author_words = {}
+
+    def add_page(self, entries):
+        self.pages += 1
+        for data in entries:
+            word = normalize_word(data.get('text'))
+            if not word:
+                continue
+            self.total_words += 1
+            self.word_counts[word] += 1
+            self.display_text.setdefault(word, data.get('text', '').strip())
+
+            author_id = data.get('authorId') or 'anonymous'
+            self.author_counts[author_id] += 1
+            if data.get('authorName'):
+                self.author_names[author_id] = data['authorName']
+            words = self.author_words.setdefault(author_id, {})
+            if len(words) < MAX_WORDS_PER_STUDENT or word in words:
+                words[word] = True
+
+    def top_pairs(self, limit=TOP_PAIRS):
+        # 같은 학생이 함께 낸 낱말 쌍을 셉니다 (학생별 집합이라 한 학생은 쌍마다 1번만 기여).
+        pair_counts = Counter()
+        for words in self.author_words.values():
+            pair_counts.update(combinations(sorted(words), 2))
+        return [
+            {'words': [self.display_text[a], self.display_text[b]], 'count': count}
+            for (a, b), count in pair_counts.most_common(limit)
+            if count > 1
+        ]
+
+    def summary(self):
+        return {
+            'totalWords': self.total_words,
+            'distinctWords': len(self.word_counts),
+            'studentCount': len(self.author_counts),
+            'topWords': [
+                {'text': self.display_text[word], 'count': count}
+                for word, count in self.word_counts.most_common(TOP_WORDS)
+            ],
+            'participation': [
+                {'authorId': author_id, 'authorName': self.author_names.get(author_id, ''), 'count': count}
+                for author_id, count in self.author_counts.most_common()
+            ],
+            'topPairs': self.top_pairs(),
+            'pagesRead': self.pages,
+        }
+
+
+def compute_word_analytics(runtime, collection, scope_id, page_size=PAGE_SIZE):
+    """
+    보관된 낱말과 현재 낱말 전체를 스트리밍으로 집계해 요약 문서에 저장하고 요약을 반환합니다.
+    """
+    analytics = WordAnalytics()
+    for page in word_entry_pages(runtime, collection, scope_id, ANALYTICS_FIELDS, page_size):
+        analytics.add_page(page)
+    summary = analytics.summary()
+    runtime.scope_doc(collection, scope_id, ANALYTICS_SUBCOLLECTION).set({
+        **summary,
+        'updatedAt': gcf.SERVER_TIMESTAMP,
+    })
+    return summary
@@ -0,0 +1,183 @@
+# 오래된 낱말 보관 (words 문서 → 묶음 보관 문서) + 보관/현재 낱말을 합쳐 읽기
+
+import os
+from datetime import datetime, timedelta, timezone
+
+from google.cloud import firestore as gcf
+
+from batch_writes import commit_atomic, delete_write, set_write, update_write
+
+# 보관 문서: {collection}/{scopeId}/wordArchive/{chunkId}
+ARCHIVE_SUBCOLLECTION = 'wordArchive'
+# 보관 문서 하나에 담는 낱말 수 (보관 문서 쓰기 1 + 삭제 N이 배치 한도 안에 들어가야 함)
+CHUNK_SIZE = 400
+# 이 시간보다 오래된 낱말을 보관합니다 (진행 중인 수업의 낱말은 그대로 둠).
+ARCHIVE_AGE_HOURS = float(os.environ.get('WORD_ARCHIVE_AGE_HOURS', '12'))
+# 예약 보관 작업 사용 여부 (기본 꺼짐)
+# 웹 화면(학생 포트폴리오 낱말 수, StudentView/레슨 화면 낱말 목록)은 아직 words 하위 컬렉션만 읽으므로,
+# 그 화면들이 wordArchive도 읽게 바뀌기 전에 켜면 오래된 낱말이 화면에서 사라집니다.
+ARCHIVE_ENABLED = os.environ.get('WORD_ARCHIVE_ENABLED', '0') == '1'
+# 예약 실행 한 번에 만드는 최대 보관 문서 수 (실행 시간 제한 안에 끝나도록)
+MAX_CHUNKS_PER_RUN = int(os.environ.get('WORD_ARCHIVE_MAX_CHUNKS', '2000'))
+# 보관 대상이 되는 범위 컬렉션
+SCOPE_COLLECTIONS = ('classrooms', 'lessons')
+# 현재 낱말을 나눠 읽는 페이지 크기
+PAGE_SIZE = 500
+# 보관 작업이 지우기 직전 낱말 문서에 남기는 표시 (보관 문서 ID)
+# 삭제 트리거는 이 표시로 보관 삭제와 교사의 삭제를 구분합니다.
+ARCHIVED_FIELD = 'archivedTo'
+
+
+def archive_cutoff(now=None):
+    """
+    이 시각보다 먼저 제출된 낱말이 보관 대상입니다.
+    """
+    return (now or datetime.now(timezone.utc)) - timedelta(hours=ARCHIVE_AGE_HOURS)
+
+
+def _millis(value):
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    return int(float(value or 0) * 1000)
+
+
+def _archive_collection(runtime, collection, scope_id):
+    return runtime.scope_collection(collection, scope_id, ARCHIVE_SUBCOLLECTION)
+
+
+def latest_archive_query(runtime, collection, scope_id):
+    """
+    가장 최근 보관 문서 1개를 읽는 쿼리입니다 (동기/비동기 런타임 모두 사용).
+    """
+    return _archive_collection(runtime, collection, scope_id).order_by(
+        'lastCreatedAt', direction=gcf.Query.DESCENDING
+    ).limit(1)
+
+
+def archived_texts_newest_first(snapshot, limit):
+    """
+    보관 문서의 낱말 텍스트를 최신순으로 최대 limit개 반환합니다.
+    """
+    entries = snapshot.to_dict().get('entries') or []
+    return [entry.get('text', '') for entry in reversed(entries[-limit:])] if limit > 0 else []
+
+
+def live_word_pages(runtime, collection, scope_id, fields=None, page_size=PAGE_SIZE, before=None):
+    """
+    현재 words 문서를 createdAt 순으로 page_size개씩 나눠 읽어 한 페이지(스냅샷 목록)씩 돌려줍니다.
+    before가 있으면 그보다 먼저 제출된 낱말만 읽습니다.
+    """
+    base_query = runtime.scope_collection(collection, scope_id, 'words')
+    if fields is not None:
+        base_query = base_query.select(fields)
+    if before is not None:
+        base_query = base_query.where(filter=gcf.FieldFilter('createdAt', '<', before))
+    base_query = base_query.order_by('createdAt').limit(page_size)
+
+    last_snapshot = None
+    while True:
+        query = base_query if last_snapshot is None else base_query.start_after(last_snapshot)
+        page = list(query.stream())
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last_snapshot = page[-1]
+
+
+def word_entry_pages(runtime, collection, scope_id, fields=None, page_size=PAGE_SIZE):
+    """
+    보관된 낱말과 현재 낱말을 합쳐 오래된 순으로 한 페이지(dict 목록)씩 돌려줍니다.
+    각 항목은 낱말 문서 필드에 'id'가 더해진 dict입니다.
+    보관 문서 하나가 곧 한 페이지이므로 읽는 문서 수는 (보관 문서 수 + 현재 낱말 수)입니다.
+    """
+    for chunk in _archive_collection(runtime, collection, scope_id).order_by('firstCreatedAt').stream():
+        entries = chunk.to_dict().get('entries') or []
+        if fields is not None:
+            entries = [{'id': entry.get('id'), **{f: entry[f] for f in fields if f in entry}} for entry in entries]
+        if entries:
+            yield entries
+    for page in live_word_pages(runtime, collection, scope_id, fields, page_size):
+        yield [{'id': snapshot.id, **snapshot.to_dict()} for snapshot in page]
+
+
+def _mark_archived(runtime, page, chunk_id):
+    # 지우기 전에 표시를 먼저 커밋해야 삭제 이벤트의 이전 데이터에 표시가 남습니다.
+    commit_atomic(runtime.db, [update_write(snapshot.reference, {ARCHIVED_FIELD: chunk_id}) for snapshot in page])
+
+
+def _unmark_archived(runtime, page):
+    try:
+        commit_atomic(runtime.db, [update_write(snapshot.reference, {ARCHIVED_FIELD: gcf.DELETE_FIELD})
+                                   for snapshot in page])
+    except Exception as e:
+        print(f"Error clearing archive marks: {e}")
+
+
+def compact_scope(runtime, collection, scope_id, cutoff, max_chunks=MAX_CHUNKS_PER_RUN):
+    """
+    cutoff보다 오래된 낱말을 CHUNK_SIZE개씩 보관 문서로 옮기고 원본을 지웁니다.
+    - 원본에 ARCHIVED_FIELD 표시를 먼저 남긴 뒤, 보관 문서 쓰기와 원본 삭제를 한 배치로 커밋합니다.
+    - 그 배치가 실패하면 표시를 지워, 나중에 교사가 지운 낱말이 보관 삭제로 보이지 않게 합니다.
+    만든 보관 문서 수를 반환합니다.
+    """
+    chunks = 0
+    while chunks < max_chunks:
+        # 삭제가 커밋되면 다음 첫 페이지가 곧 다음 묶음이므로 커서 없이 다시 읽습니다.
+        page = next(live_word_pages(runtime, collection, scope_id, page_size=CHUNK_SIZE, before=cutoff), None)
+        if not page:
+            break
+        entries = [{'id': snapshot.id, **snapshot.to_dict()} for snapshot in page]
+        for entry in entries:
+            entry.pop(ARCHIVED_FIELD, None)
+        first, last = entries[0], entries[-1]
+        chunk_id = f"{_millis(first.get('createdAt')):013d}-{first['id']}"
+        chunk_ref = _archive_collection(runtime, collection, scope_id).document(chunk_id)
+        writes = [set_write(chunk_ref, {
+            'entries': entries,
+            'count': len(entries),
+            'firstCreatedAt': first.get('createdAt'),
+            'lastCreatedAt': last.get('createdAt'),
+            'archivedAt': gcf.SERVER_TIMESTAMP,
+        })]
+        writes.extend(delete_write(snapshot.reference) for snapshot in page)
+        _mark_archived(runtime, page, chunk_id)
+        try:
+            commit_atomic(runtime.db, writes)
+        except Exception:
+            _unmark_archived(runtime, page)
+            raise
+        chunks += 1
+        if len(page) < CHUNK_SIZE:
+            break
+    return chunks
+
+
+def compact_all(runtime, cutoff=None, max_chunks=MAX_CHUNKS_PER_RUN):
+    """
+    모든 클래스/레슨의 오래된 낱말을 보관합니다. 처리한 범위 수, 만든 보관 문서 수, 오류 수를 반환합니다.
+    한 범위가 실패해도 나머지 범위는 계속 처리합니다.
+    """
+    cutoff = cutoff if cutoff is not None else archive_cutoff()
+    summary = {'scopes': 0, 'chunks': 0, 'errors': 0}
+    for collection in SCOPE_COLLECTIONS:
+        for scope in runtime.collections[collection].select([]).stream():
+            if summary['chunks'] >= max_chunks:
+                return summary
+            summary['scopes'] += 1
+            try:
+                summary['chunks'] += compact_scope(runtime, collection, scope.id, cutoff,
+                                                   max_chunks - summary['chunks'])
+            except Exception as e:
+                summary['errors'] += 1
+                print(f"Error compacting words for {collection}/{scope.id}: {e}")
+    return summary
+
+
+def is_archive_deletion(word_data):
+    """
+    삭제된 낱말이 보관 작업으로 지워진 것인지 확인합니다.
+    보관 작업이 켜져 있고 낱말에 보관 표시가 있을 때만 True입니다 (나이로는 판단하지 않음).
+    """
+    return ARCHIVE_ENABLED and bool((word_data or {}).get(ARCHIVED_FIELD))
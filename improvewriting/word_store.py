@@ -0,0 +1,118 @@
+# 제출된 낱말 읽기 계층 (필드 투영 + 정렬 + 개수 제한)
+
+import asyncio
+
+from google.cloud import firestore as gcf
+
+from word_archive import archived_texts_newest_first, latest_archive_query
+
+# 최근 낱말 요약 문서: {collection}/{scopeId}/wordSummary/current
+SUMMARY_SUBCOLLECTION = 'wordSummary'
+# 요약 문서에 보관하는 최근 낱말 최대 개수
+SUMMARY_SIZE = 20
+# 목록이 이 길이를 넘으면 오래된 항목을 잘라 SUMMARY_SIZE개로 줄입니다 (문서 크기 상한).
+TRIM_THRESHOLD = SUMMARY_SIZE * 2
+
+
+def _newest_first(entries):
+    # 트리거 도착 순서와 무관하게 createdAt 역순으로 정렬합니다.
+    return sorted(entries, key=lambda entry: (entry.get('createdAt') is not None, entry.get('createdAt')), reverse=True)
+
+
+def _summary_texts(summary_doc, limit):
+    """
+    요약 문서에 최근 낱말이 limit개 이상 있으면 텍스트 목록을, 모자라면 None(쿼리로 읽기)을 반환합니다.
+    """
+    if not summary_doc.exists:
+        return None
+    recent = _newest_first(summary_doc.to_dict().get('recentWords') or [])
+    if len(recent) < limit:
+        return None
+    return [entry.get('text', '') for entry in recent[:limit]]
+
+
+def fetch_recent_words(runtime, collection, scope_id, limit, use_summary=True):
+    """
+    최근에 제출된 낱말 텍스트를 최신순으로 최대 limit개 반환합니다.
+    - 요약 문서에 limit개 이상 있으면 문서 1개만 읽습니다.
+    - 모자라면 (새 수업, 삭제, 놓친 트리거) 'text' 필드만 투영한 createdAt 역순 쿼리로 limit개만 읽습니다.
+    - 현재 낱말이 모자라면 (오래된 낱말이 보관되었으면) 가장 최근 보관 문서 1개로 채웁니다.
+    어느 쪽이든 읽는 문서 수가 누적된 낱말 수와 무관합니다.
+    """
+    if use_summary and limit <= SUMMARY_SIZE:
+        texts = _summary_texts(runtime.scope_doc(collection, scope_id, SUMMARY_SUBCOLLECTION).get(), limit)
+        if texts is not None:
+            return texts
+
+    query = (
+        runtime.scope_collection(collection, scope_id, 'words')
+        .select(['text'])
+        .order_by('createdAt', direction=gcf.Query.DESCENDING)
+        .limit(limit)
+    )
+    words = [doc.to_dict().get('text', '') for doc in query.stream()]
+    if len(words) < limit:
+        for chunk in latest_archive_query(runtime, collection, scope_id).stream():
+            words.extend(archived_texts_newest_first(chunk, limit - len(words)))
+    return words
+
+
+def _remove_entries(summary_ref, predicate):
+    # 조건에 맞는 항목을 ArrayRemove로 지웁니다 (동시에 추가된 항목은 건드리지 않음).
+    snapshot = summary_ref.get(field_paths=['recentWords'])
+    if not snapshot.exists:
+        return 0
+    recent = snapshot.to_dict().get('recentWords') or []
+    removed = predicate(recent)
+    if removed:
+        summary_ref.update({'recentWords': gcf.ArrayRemove(removed), 'updatedAt': gcf.SERVER_TIMESTAMP})
+    return len(removed)
+
+
+def record_word(db, summary_ref, word_id, text, created_at=None):
+    """
+    요약 문서의 최근 낱말 목록에 새 낱말을 추가합니다.
+    - ArrayUnion 병합 쓰기라 동시에 제출해도 트랜잭션 경합이 없고,
+      같은 이벤트가 다시 전달되어도 같은 항목이라 한 번만 남습니다.
+    - 쓰기 뒤 목록을 읽어, TRIM_THRESHOLD를 넘었으면 오래된 항목을 ArrayRemove로 잘라 SUMMARY_SIZE개로 줄입니다.
+      매번 확인하므로 목록은 TRIM_THRESHOLD(+ 동시에 추가 중인 낱말 수)를 넘지 않습니다.
+    """
+    entry = {'id': word_id, 'text': text, 'createdAt': created_at}
+    summary_ref.set({'recentWords': gcf.ArrayUnion([entry]), 'updatedAt': gcf.SERVER_TIMESTAMP}, merge=True)
+    _remove_entries(summary_ref, lambda recent: (
+        _newest_first(recent)[SUMMARY_SIZE:] if len(recent) > TRIM_THRESHOLD else []
+    ))
+
+
+def forget_word(db, summary_ref, word_id):
+    """
+    삭제된 낱말을 요약 문서에서 제거합니다.
+    """
+    _remove_entries(summary_ref, lambda recent: [entry for entry in recent if entry.get('id') == word_id])
+
+
+async def fetch_recent_words_async(runtime, collection, scope_id, limit, use_summary=True, timeout=5.0):
+    """
+    fetch_recent_words의 AsyncClient 버전입니다 (호출마다 제한 시간 적용).
+    """
+    if use_summary and limit <= SUMMARY_SIZE:
+        summary_ref = runtime.scope_doc(collection, scope_id, SUMMARY_SUBCOLLECTION)
+        texts = _summary_texts(await asyncio.wait_for(summary_ref.get(), timeout), limit)
+        if texts is not None:
+            return texts
+
+    query = (
+        runtime.scope_collection(collection, scope_id, 'words')
+        .select(['text'])
+        .order_by('createdAt', direction=gcf.Query.DESCENDING)
+        .limit(limit)
+    )
+
+    async def _collect():
+        words = [doc.to_dict().get('text', '') async for doc in query.stream()]
+        if len(words) < limit:
+            async for chunk in latest_archive_query(runtime, collection, scope_id).stream():
+                words.extend(archived_texts_newest_first(chunk, limit - len(words)))
+        return words
+
+    return await asyncio.wait_for(_collect(), timeout)